@@ -12,7 +12,7 @@ from typing import Dict, List, Any, Optional, Tuple
 from dataclasses import dataclass
 
 from ..shared.utils import (
-    ConfigManager, Logger, TimestampUtils, MessageFormatter
+    get_config_manager, Logger, TimestampUtils, MessageFormatter
 )
 from ..shared.messaging import create_agent_communication, Message, MessageType
 
@@ -514,7 +514,7 @@ class AnalysisAgent:
     """Main analysis agent that performs root cause analysis"""
 
     def __init__(self):
-        self.config_manager = ConfigManager()
+        self.config_manager = get_config_manager()
         self.logger = Logger.setup_logger("AnalysisAgent")
         self.communication = create_agent_communication("analysis")
 
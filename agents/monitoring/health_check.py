@@ -14,7 +14,7 @@ from typing import Dict, List, Optional, Tuple
 from urllib.parse import urlparse
 
 from ..shared.utils import (
-    ConfigManager, Logger, HealthCheckResult, Incident,
+    get_config_manager, Logger, HealthCheckResult, Incident,
     IncidentStatus, AlertLevel, IncidentIDGenerator,
     NetworkUtils, TimestampUtils, MessageFormatter
 )
@@ -23,8 +23,13 @@ from ..shared.messaging import create_agent_communication, get_message_queue
 class HealthChecker:
     """Handles individual health checks for endpoints"""
 
-    def __init__(self, endpoint_config: Dict[str, Any]):
+    _shared_session: Optional[aiohttp.ClientSession] = None  # pooled across all checkers
+    _shared_session_loop: Optional[asyncio.AbstractEventLoop] = None  # loop the pool is bound to
+
+    def __init__(self, endpoint_config: Dict[str, Any],
+                 session: Optional[aiohttp.ClientSession] = None):
         self.config = endpoint_config
+        self.session = session  # caller-owned session; the shared pool is used otherwise
         self.logger = Logger.setup_logger(f"HealthChecker_{endpoint_config['name']}")
         self.consecutive_failures = 0
 
@@ -93,21 +98,47 @@ class HealthChecker:
             self.logger.error(f"Health check exception: {self.config['name']} - {error_message}")
             return result
 
+    @classmethod
+    def _session(cls) -> aiohttp.ClientSession:
+        """Get the session shared by all checkers so connections and DNS lookups are reused"""
+        loop = asyncio.get_running_loop()
+
+        # A session only works on the loop that created it, so a new loop gets a new pool
+        if (cls._shared_session is None or cls._shared_session.closed
+                or cls._shared_session_loop is not loop):
+            cls._shared_session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=100, ttl_dns_cache=300)
+            )
+            cls._shared_session_loop = loop
+        return cls._shared_session
+
+    @classmethod
+    async def close_shared_session(cls):
+        """Close the shared session, if one was opened on the running loop"""
+        if cls._shared_session is not None and cls._shared_session_loop is asyncio.get_running_loop():
+            await cls._shared_session.close()
+        cls._shared_session = None
+        cls._shared_session_loop = None
+
     async def _make_http_request(self) -> Dict[str, Any]:
         """Make HTTP request with timeout and error handling"""
         timeout = aiohttp.ClientTimeout(total=self.config['timeout'])
-
-        async with aiohttp.ClientSession(timeout=timeout) as session:
-            async with session.request(
-                method=self.config['method'],
-                url=self.config['url'],
-                headers={'User-Agent': 'DevOps-Sentinel/1.0'}
-            ) as response:
-                return {
-                    'status_code': response.status,
-                    'headers': dict(response.headers),
-                    'content_length': response.headers.get('content-length', '0')
-                }
+        return await self._send_request(self.session or self._session(), timeout)
+
+    async def _send_request(self, session: aiohttp.ClientSession,
+                            timeout: aiohttp.ClientTimeout) -> Dict[str, Any]:
+        """Issue the configured request on the given session"""
+        async with session.request(
+            method=self.config['method'],
+            url=self.config['url'],
+            headers={'User-Agent': 'DevOps-Sentinel/1.0'},
+            timeout=timeout
+        ) as response:
+            return {
+                'status_code': response.status,
+                'headers': dict(response.headers),
+                'content_length': response.headers.get('content-length', '0')
+            }
 
     def _check_ssl_expiry(self) -> Optional[int]:
         """Check SSL certificate expiry for HTTPS endpoints"""
@@ -146,7 +177,7 @@ class MonitoringAgent:
     """Main monitoring agent that orchestrates health checks"""
 
     def __init__(self):
-        self.config_manager = ConfigManager()
+        self.config_manager = get_config_manager()
         self.logger = Logger.setup_logger("MonitoringAgent")
         self.communication = create_agent_communication("monitoring")
         self.health_checkers: Dict[str, HealthChecker] = {}
@@ -182,6 +213,7 @@ class MonitoringAgent:
     async def stop_monitoring(self):
         """Stop monitoring loop"""
         self.running = False
+        await HealthChecker.close_shared_session()
         self.logger.info("Monitoring stopped")
 
     async def _monitoring_cycle(self):
@@ -233,7 +265,7 @@ class MonitoringAgent:
 
         # Create new incident
         incident = Incident(
-            id=IncidentIDGenerator.generate(),
+            id=IncidentIDGenerator.generate(result.timestamp),
             endpoint_name=endpoint_name,
             status=IncidentStatus.DETECTED,
             alert_level=self._determine_alert_level(result),
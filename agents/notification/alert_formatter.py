@@ -10,7 +10,7 @@ from typing import Dict, List, Any, Optional
 from dataclasses import dataclass
 
 from ..shared.utils import (
-    ConfigManager, Logger, TimestampUtils, AlertLevel
+    get_config_manager, Logger, TimestampUtils, AlertLevel
 )
 
 @dataclass
@@ -29,10 +29,55 @@ class AlertMessage:
 class AlertFormatter:
     """Format alerts for different delivery channels"""
 
+    # Per-level lookup tables, built once with the class
+    SLACK_COLORS = {
+        "low": "#36a64f",      # Green
+        "medium": "#ff9500",   # Orange
+        "high": "#ff6b00",     # Dark orange
+        "critical": "#ff0000"  # Red
+    }
+
+    EMAIL_PRIORITIES = {
+        "low": "5",
+        "medium": "3",
+        "high": "2",
+        "critical": "1"
+    }
+
+    EMAIL_COLORS = {
+        "low": "#28a745",
+        "medium": "#ffc107",
+        "high": "#fd7e14",
+        "critical": "#dc3545"
+    }
+
+    PAGERDUTY_SEVERITIES = {
+        "low": "info",
+        "medium": "warning",
+        "high": "error",
+        "critical": "critical"
+    }
+
+    TEAMS_THEME_COLORS = {
+        "low": "00FF00",
+        "medium": "FFFF00",
+        "high": "FF9900",
+        "critical": "FF0000"
+    }
+
+    _instance: Optional["AlertFormatter"] = None
+
     def __init__(self):
-        self.config_manager = ConfigManager()
+        self.config_manager = get_config_manager()
         self.logger = Logger.setup_logger("AlertFormatter")
 
+    @classmethod
+    def get(cls) -> "AlertFormatter":
+        """Get the shared formatter instance, creating it on first use"""
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
     def format_slack_alert(self, incident_data: Dict[str, Any]) -> Dict[str, Any]:
         """Format alert for Slack delivery"""
         try:
@@ -230,13 +275,7 @@ class AlertFormatter:
 
     def _get_slack_color(self, alert_level: str) -> str:
         """Get Slack color based on alert level"""
-        colors = {
-            "low": "#36a64f",      # Green
-            "medium": "#ff9500",   # Orange
-            "high": "#ff6b00",     # Dark orange
-            "critical": "#ff0000"  # Red
-        }
-        return colors.get(alert_level, "#ff9500")
+        return self.SLACK_COLORS.get(alert_level, "#ff9500")
 
     def _generate_slack_summary(self, incident_data: Dict[str, Any]) -> str:
         """Generate Slack message summary"""
@@ -508,33 +547,15 @@ This alert was generated by DevOps Sentinel
 
     def _get_email_priority(self, alert_level: str) -> str:
         """Get email priority based on alert level"""
-        priorities = {
-            "low": "5",
-            "medium": "3",
-            "high": "2",
-            "critical": "1"
-        }
-        return priorities.get(alert_level, "3")
+        return self.EMAIL_PRIORITIES.get(alert_level, "3")
 
     def _get_email_color(self, alert_level: str) -> str:
         """Get email header color based on alert level"""
-        colors = {
-            "low": "#28a745",
-            "medium": "#ffc107",
-            "high": "#fd7e14",
-            "critical": "#dc3545"
-        }
-        return colors.get(alert_level, "#ffc107")
+        return self.EMAIL_COLORS.get(alert_level, "#ffc107")
 
     def _get_pagerduty_severity(self, alert_level: str) -> str:
         """Get PagerDuty severity based on alert level"""
-        severities = {
-            "low": "info",
-            "medium": "warning",
-            "high": "error",
-            "critical": "critical"
-        }
-        return severities.get(alert_level, "warning")
+        return self.PAGERDUTY_SEVERITIES.get(alert_level, "warning")
 
     def _get_pagerduty_routing_key(self) -> str:
         """Get PagerDuty routing key (would be configured)"""
@@ -542,13 +563,7 @@ This alert was generated by DevOps Sentinel
 
     def _get_teams_theme_color(self, alert_level: str) -> str:
         """Get Teams theme color based on alert level"""
-        colors = {
-            "low": "00FF00",
-            "medium": "FFFF00",
-            "high": "FF9900",
-            "critical": "FF0000"
-        }
-        return colors.get(alert_level, "FFFF00")
+        return self.TEAMS_THEME_COLORS.get(alert_level, "FFFF00")
 
     def _extract_recommended_actions(self, analysis_result: Dict[str, Any]) -> List[str]:
         """Extract recommended actions from analysis result"""
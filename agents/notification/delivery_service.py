@@ -7,16 +7,27 @@ import asyncio
 import aiohttp
 import json
 import smtplib
+import time
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from datetime import datetime, timezone, timedelta
-from typing import Dict, List, Any, Optional, Tuple
+from typing import Dict, List, Any, Optional, Tuple, Callable
 from dataclasses import dataclass
+from functools import partial
 
 from ..shared.utils import (
-    ConfigManager, Logger, TimestampUtils
+    get_config_manager, Logger, TimestampUtils
 )
-from ..shared.messaging import create_agent_communication, Message, MessageType
+from ..shared.messaging import (
+    create_agent_communication, Message, MessageType, encode_payload, decode_payload
+)
+
+# Payloads are pre-serialized (orjson when installed), so the content type is set explicitly
+JSON_HEADERS = {'Content-Type': 'application/json'}
+
+# Providers drop long-lived SMTP sessions, so pooled connections are recycled
+SMTP_MAX_SENDS_PER_CONNECTION = 5000
+SMTP_MAX_CONNECTION_AGE = 300  # seconds
 
 @dataclass
 class DeliveryResult:
@@ -39,39 +50,42 @@ class SlackDelivery:
     async def send_alert(self, formatted_alert: Dict[str, Any]) -> DeliveryResult:
         """Send alert to Slack"""
         try:
+            now = TimestampUtils.now_utc()
             if not self.webhook_url:
                 return DeliveryResult(
                     channel="slack",
                     success=False,
                     message="Slack webhook URL not configured",
-                    timestamp=TimestampUtils.now_utc()
+                    timestamp=now
                 )
 
             async with aiohttp.ClientSession() as session:
                 async with session.post(
                     self.webhook_url,
-                    json=formatted_alert,
+                    data=encode_payload(formatted_alert),
+                    headers=JSON_HEADERS,
                     timeout=aiohttp.ClientTimeout(total=self.timeout)
                 ) as response:
-                    response_text = await response.text()
-
+                    now = TimestampUtils.now_utc()
                     if response.status == 200:
                         self.logger.info("Slack alert sent successfully")
                         return DeliveryResult(
                             channel="slack",
                             success=True,
                             message="Alert sent to Slack successfully",
-                            timestamp=TimestampUtils.now_utc(),
+                            timestamp=now,
                             response_data={"status_code": response.status}
                         )
                     else:
+                        # Only read the body when it carries an error worth logging
+                        response_text = await response.text()
                         error_msg = f"Slack API error: {response.status} - {response_text}"
                         self.logger.error(error_msg)
                         return DeliveryResult(
                             channel="slack",
                             success=False,
                             message=error_msg,
-                            timestamp=TimestampUtils.now_utc(),
+                            timestamp=now,
                             response_data={"status_code": response.status, "response": response_text}
                         )
 
@@ -102,15 +116,21 @@ class EmailDelivery:
         self.logger = Logger.setup_logger("EmailDelivery")
         self.smtp_config = config.get('smtp_config', {})
 
+        # Pooled SMTP connection, reused across alerts until it is recycled
+        self._smtp: Optional[smtplib.SMTP] = None
+        self._smtp_sends = 0
+        self._smtp_opened_at = 0.0
+
     async def send_alert(self, formatted_alert: Dict[str, Any]) -> DeliveryResult:
         """Send alert via email"""
         try:
+            now = TimestampUtils.now_utc()
             if not self.smtp_config:
                 return DeliveryResult(
                     channel="email",
                     success=False,
                     message="SMTP configuration not available",
-                    timestamp=TimestampUtils.now_utc()
+                    timestamp=now
                 )
 
             # Extract email details
@@ -124,7 +144,7 @@ class EmailDelivery:
                     channel="email",
                     success=False,
                     message="No email recipients specified",
-                    timestamp=TimestampUtils.now_utc()
+                    timestamp=now
                 )
 
             # Send email
@@ -169,20 +189,14 @@ class EmailDelivery:
                 message.attach(html_part)
 
             # Send email
-            with smtplib.SMTP(
-                self.smtp_config.get('host', 'localhost'),
-                self.smtp_config.get('port', 587)
-            ) as server:
-                if self.smtp_config.get('use_tls', True):
-                    server.starttls()
-
-                if self.smtp_config.get('username') and self.smtp_config.get('password'):
-                    server.login(
-                        self.smtp_config['username'],
-                        self.smtp_config['password']
-                    )
+            try:
+                self._get_smtp().send_message(message)
+            except smtplib.SMTPServerDisconnected:
+                # The server closed the pooled connection; reconnect once and retry
+                self._close_smtp()
+                self._get_smtp().send_message(message)
 
-                server.send_message(message)
+            self._smtp_sends += 1
 
             self.logger.info(f"Email sent successfully to {len(recipients)} recipients")
             return DeliveryResult(
@@ -202,6 +216,64 @@ class EmailDelivery:
                 timestamp=TimestampUtils.now_utc()
             )
 
+    def _get_smtp(self) -> smtplib.SMTP:
+        """Get the pooled SMTP connection, recycling it when stale"""
+        if self._smtp is not None:
+            expired = (
+                self._smtp_sends >= SMTP_MAX_SENDS_PER_CONNECTION or
+                time.monotonic() - self._smtp_opened_at > SMTP_MAX_CONNECTION_AGE
+            )
+            if expired or not self._smtp_alive():
+                self._close_smtp()
+
+        if self._smtp is None:
+            self._smtp = self._open_smtp()
+            self._smtp_sends = 0
+            self._smtp_opened_at = time.monotonic()
+
+        return self._smtp
+
+    def _open_smtp(self) -> smtplib.SMTP:
+        """Open and authenticate a new SMTP connection"""
+        server = smtplib.SMTP(
+            self.smtp_config.get('host', 'localhost'),
+            self.smtp_config.get('port', 587)
+        )
+
+        try:
+            if self.smtp_config.get('use_tls', True):
+                server.starttls()
+
+            if self.smtp_config.get('username') and self.smtp_config.get('password'):
+                server.login(
+                    self.smtp_config['username'],
+                    self.smtp_config['password']
+                )
+        except Exception:
+            server.close()
+            raise
+
+        return server
+
+    def _smtp_alive(self) -> bool:
+        """Check the pooled connection is still accepted by the server"""
+        try:
+            return self._smtp.noop()[0] == 250
+        except (smtplib.SMTPException, OSError):
+            return False
+
+    def _close_smtp(self):
+        """Close the pooled SMTP connection"""
+        if self._smtp is None:
+            return
+
+        try:
+            self._smtp.quit()
+        except (smtplib.SMTPException, OSError):
+            self._smtp.close()
+        finally:
+            self._smtp = None
+
 class PagerDutyDelivery:
     """Handle PagerDuty alert delivery"""
 
@@ -214,12 +286,13 @@ class PagerDutyDelivery:
     async def send_alert(self, formatted_alert: Dict[str, Any]) -> DeliveryResult:
         """Send alert to PagerDuty"""
         try:
+            now = TimestampUtils.now_utc()
             if not self.integration_key:
                 return DeliveryResult(
                     channel="pagerduty",
                     success=False,
                     message="PagerDuty integration key not configured",
-                    timestamp=TimestampUtils.now_utc()
+                    timestamp=now
                 )
 
             url = "https://events.pagerduty.com/v2/enqueue"
@@ -227,10 +300,12 @@ class PagerDutyDelivery:
             async with aiohttp.ClientSession() as session:
                 async with session.post(
                     url,
-                    json=formatted_alert,
+                    data=encode_payload(formatted_alert),
+                    headers=JSON_HEADERS,
                     timeout=aiohttp.ClientTimeout(total=self.timeout)
                 ) as response:
-                    response_data = await response.json()
+                    now = TimestampUtils.now_utc()
+                    response_data = decode_payload(await response.read())
 
                     if response.status == 202:  # Accepted
                         dedup_key = response_data.get('dedup_key')
@@ -239,7 +314,7 @@ class PagerDutyDelivery:
                             channel="pagerduty",
                             success=True,
                             message=f"Alert sent to PagerDuty (dedup_key: {dedup_key})",
-                            timestamp=TimestampUtils.now_utc(),
+                            timestamp=now,
                             response_data=response_data
                         )
                     else:
@@ -249,7 +324,7 @@ class PagerDutyDelivery:
                             channel="pagerduty",
                             success=False,
                             message=error_msg,
-                            timestamp=TimestampUtils.now_utc(),
+                            timestamp=now,
                             response_data={"status_code": response.status, "response": response_data}
                         )
 
@@ -284,39 +359,41 @@ class TeamsDelivery:
     async def send_alert(self, formatted_alert: Dict[str, Any]) -> DeliveryResult:
         """Send alert to Microsoft Teams"""
         try:
+            now = TimestampUtils.now_utc()
             if not self.webhook_url:
                 return DeliveryResult(
                     channel="teams",
                     success=False,
                     message="Teams webhook URL not configured",
-                    timestamp=TimestampUtils.now_utc()
+                    timestamp=now
                 )
 
             async with aiohttp.ClientSession() as session:
                 async with session.post(
                     self.webhook_url,
-                    json=formatted_alert,
+                    data=encode_payload(formatted_alert),
+                    headers=JSON_HEADERS,
                     timeout=aiohttp.ClientTimeout(total=self.timeout)
                 ) as response:
-                    response_text = await response.text()
-
+                    now = TimestampUtils.now_utc()
                     if response.status == 200:
                         self.logger.info("Teams alert sent successfully")
                         return DeliveryResult(
                             channel="teams",
                             success=True,
                             message="Alert sent to Teams successfully",
-                            timestamp=TimestampUtils.now_utc(),
+                            timestamp=now,
                             response_data={"status_code": response.status}
                         )
                     else:
+                        response_text = await response.text()
                         error_msg = f"Teams API error: {response.status} - {response_text}"
                         self.logger.error(error_msg)
                         return DeliveryResult(
                             channel="teams",
                             success=False,
                             message=error_msg,
-                            timestamp=TimestampUtils.now_utc(),
+                            timestamp=now,
                             response_data={"status_code": response.status, "response": response_text}
                         )
 
@@ -343,7 +420,7 @@ class AlertDeliveryService:
     """Main service for delivering alerts to multiple channels"""
 
     def __init__(self):
-        self.config_manager = ConfigManager()
+        self.config_manager = get_config_manager()
         self.logger = Logger.setup_logger("AlertDeliveryService")
         self.communication = create_agent_communication("notification")
 
@@ -351,9 +428,13 @@ class AlertDeliveryService:
         self.notification_config = self.config_manager.get_agent_config("notification")
         self.delivery_services = self._initialize_delivery_services()
 
+        # One format-and-send pipeline per enabled channel, bound on first delivery
+        self.delivery_pipelines: Optional[Dict[str, Callable]] = None
+
         # Alert deduplication and cooldown
         self.recent_alerts: Dict[str, datetime] = {}
         self.cooldown_period = self.notification_config.get('cooldown_period', 15)  # minutes
+        self.delivery_timeout = self.notification_config.get('delivery_timeout', 45)  # seconds
 
         # Register message handler
         get_message_queue().register_handler("notification", self._handle_message)
@@ -391,6 +472,24 @@ class AlertDeliveryService:
         self.logger.info(f"Initialized delivery services: {list(services.keys())}")
         return services
 
+    def _build_delivery_pipelines(self) -> Dict[str, Callable]:
+        """Bind each delivery service to its channel formatter"""
+        # Imported here so the service loads even when formatting is unavailable
+        from .alert_formatter import AlertFormatter
+        formatter = AlertFormatter.get()
+
+        channel_formatters = {
+            'slack': formatter.format_slack_alert,
+            'email': formatter.format_email_alert,
+            'pagerduty': formatter.format_pagerduty_alert,
+            'teams': formatter.format_teams_alert
+        }
+
+        return {
+            channel: partial(_format_and_send, channel_formatters[channel], service.send_alert)
+            for channel, service in self.delivery_services.items()
+        }
+
     async def _handle_message(self, message: Message):
         """Handle incoming notification requests"""
         try:
@@ -404,9 +503,10 @@ class AlertDeliveryService:
 
     async def _process_notification_request(self, message: Message):
         """Process notification request and deliver alerts"""
+        incident_id = 'unknown'
         try:
             data = message.data
-            incident = data.get('incident')
+            incident = data.get('incident') or {}
             incident_id = incident.get('id', 'unknown')
 
             self.logger.info(f"Processing notification request for incident {incident_id}")
@@ -421,10 +521,6 @@ class AlertDeliveryService:
                 })
                 return
 
-            # Format alerts for different channels
-            from .alert_formatter import AlertFormatter
-            formatter = AlertFormatter()
-
             # Determine which channels to use based on alert level and configuration
             channels = self._determine_delivery_channels(incident)
 
@@ -438,7 +534,7 @@ class AlertDeliveryService:
                 return
 
             # Deliver alerts
-            delivery_results = await self._deliver_alerts(incident, channels, formatter)
+            delivery_results = await self._deliver_alerts(incident, channels)
 
             # Update cooldown tracking
             self._update_cooldown_tracking(incident)
@@ -473,7 +569,7 @@ class AlertDeliveryService:
             self.communication.send_response(message, {
                 "status": "error",
                 "error": str(e),
-                "incident_id": incident.get('id', 'unknown')
+                "incident_id": incident_id
             })
 
     def _is_in_cooldown(self, incident: Dict[str, Any]) -> bool:
@@ -532,72 +628,51 @@ class AlertDeliveryService:
         return current_value >= min_value
 
     async def _deliver_alerts(
-        self, incident: Dict[str, Any], channels: List[str], formatter
+        self, incident: Dict[str, Any], channels: List[str]
     ) -> List[DeliveryResult]:
         """Deliver alerts to specified channels"""
-        delivery_tasks = []
+        if self.delivery_pipelines is None:
+            self.delivery_pipelines = self._build_delivery_pipelines()
 
-        for channel in channels:
-            if channel in self.delivery_services:
-                task = self._deliver_to_channel(incident, channel, formatter)
-                delivery_tasks.append(task)
+        delivery_tasks = {
+            asyncio.create_task(self.delivery_pipelines[channel](incident)): channel
+            for channel in channels
+            if channel in self.delivery_pipelines
+        }
 
-        # Execute deliveries concurrently
-        results = await asyncio.gather(*delivery_tasks, return_exceptions=True)
+        if not delivery_tasks:
+            return []
 
-        # Convert exceptions to failed results
+        # Execute deliveries concurrently, cancelling stragglers at the deadline
+        _, pending = await asyncio.wait(delivery_tasks, timeout=self.delivery_timeout)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        now = TimestampUtils.now_utc()
+
+        # Convert exceptions and timeouts to failed results
         delivery_results = []
-        for i, result in enumerate(results):
-            if isinstance(result, Exception):
+        for task, channel in delivery_tasks.items():
+            if task in pending:
+                self.logger.error(f"Delivery to {channel} exceeded {self.delivery_timeout}s deadline")
                 delivery_results.append(DeliveryResult(
-                    channel=channels[i],
+                    channel=channel,
                     success=False,
-                    message=f"Delivery exception: {str(result)}",
-                    timestamp=TimestampUtils.now_utc()
+                    message=f"Delivery timed out after {self.delivery_timeout}s",
+                    timestamp=now
                 ))
-            else:
-                delivery_results.append(result)
-
-        return delivery_results
-
-    async def _deliver_to_channel(
-        self, incident: Dict[str, Any], channel: str, formatter
-    ) -> DeliveryResult:
-        """Deliver alert to specific channel"""
-        try:
-            # Format alert for the channel
-            if channel == 'slack':
-                formatted_alert = formatter.format_slack_alert(incident)
-                delivery_service = self.delivery_services['slack']
-            elif channel == 'email':
-                formatted_alert = formatter.format_email_alert(incident)
-                delivery_service = self.delivery_services['email']
-            elif channel == 'pagerduty':
-                formatted_alert = formatter.format_pagerduty_alert(incident)
-                delivery_service = self.delivery_services['pagerduty']
-            elif channel == 'teams':
-                formatted_alert = formatter.format_teams_alert(incident)
-                delivery_service = self.delivery_services['teams']
-            else:
-                return DeliveryResult(
+            elif task.exception() is not None:
+                self.logger.error(f"Error delivering to {channel}: {task.exception()}")
+                delivery_results.append(DeliveryResult(
                     channel=channel,
                     success=False,
-                    message=f"Unsupported channel: {channel}",
-                    timestamp=TimestampUtils.now_utc()
-                )
-
-            # Deliver the alert
-            result = await delivery_service.send_alert(formatted_alert)
-            return result
+                    message=f"Delivery exception: {str(task.exception())}",
+                    timestamp=now
+                ))
+            else:
+                delivery_results.append(task.result())
 
-        except Exception as e:
-            self.logger.error(f"Error delivering to {channel}: {e}")
-            return DeliveryResult(
-                channel=channel,
-                success=False,
-                message=f"Channel delivery error: {str(e)}",
-                timestamp=TimestampUtils.now_utc()
-            )
+        return delivery_results
 
     def _update_cooldown_tracking(self, incident: Dict[str, Any]):
         """Update cooldown tracking for the incident"""
@@ -605,10 +680,11 @@ class AlertDeliveryService:
         alert_level = incident.get('alert_level', 'medium')
         cooldown_key = f"{service_name}:{alert_level}"
 
-        self.recent_alerts[cooldown_key] = TimestampUtils.now_utc()
+        now = TimestampUtils.now_utc()
+        self.recent_alerts[cooldown_key] = now
 
         # Clean up old entries (older than 1 hour)
-        cutoff_time = TimestampUtils.now_utc() - timedelta(hours=1)
+        cutoff_time = now - timedelta(hours=1)
         old_keys = [
             key for key, timestamp in self.recent_alerts.items()
             if timestamp < cutoff_time
@@ -641,11 +717,20 @@ class AlertDeliveryService:
             "available_channels": list(self.delivery_services.keys()),
             "recent_alerts_count": len(self.recent_alerts),
             "cooldown_period_minutes": self.cooldown_period,
+            "delivery_timeout_seconds": self.delivery_timeout,
             "services_status": {
                 name: "available" for name in self.delivery_services.keys()
             }
         }
 
+async def _format_and_send(
+    format_alert: Callable[[Dict[str, Any]], Dict[str, Any]],
+    send_alert: Callable[[Dict[str, Any]], Any],
+    incident: Dict[str, Any]
+) -> DeliveryResult:
+    """Format an incident for one channel and deliver it"""
+    return await send_alert(format_alert(incident))
+
 # Main execution function for Compyle platform
 async def main():
     """Main entry point for notification agent"""
@@ -5,27 +5,111 @@ Gather comprehensive diagnostic data upon failure detection
 
 import asyncio
 import aiohttp
-import subprocess
+import itertools
 import json
+import os
 import re
 import time
+from collections import OrderedDict
 from datetime import datetime, timezone, timedelta
+from functools import lru_cache
 from typing import Dict, List, Any, Optional, Tuple
 from urllib.parse import urlparse
 import socket
 
+try:
+    import psutil
+except ImportError:  # Fall back to reading /proc directly
+    psutil = None
+
 from ..shared.utils import (
-    ConfigManager, Logger, TimestampUtils, MessageFormatter
+    get_config_manager, Logger, TimestampUtils, MessageFormatter
+)
+from ..shared.messaging import (
+    create_agent_communication, get_message_queue, Message, MessageType, decode_payload
 )
-from ..shared.messaging import create_agent_communication, Message, MessageType
+from .diagnostic_tools import DatabaseDiagnostics
+
+# Common error patterns searched for in collected logs
+ERROR_KEYWORDS = [
+    'connection refused', 'timeout', 'out of memory',
+    'database error', 'null pointer', 'stack overflow',
+    'authentication failed', 'authorization failed'
+]
+
+@lru_cache(maxsize=500)
+def _compile(pattern: str, flags: int = re.IGNORECASE) -> re.Pattern:
+    """Compile a regex, reusing earlier compilations of the same pattern"""
+    return re.compile(pattern, flags)
+
+def keywords_regex(keywords: List[str]) -> re.Pattern:
+    """Build a case-insensitive regex matching any of the given keywords"""
+    return _compile('|'.join(map(re.escape, keywords)))
+
+ERROR_KEYWORDS_RE = keywords_regex(ERROR_KEYWORDS)
+
+# Patterns for parsing ping and traceroute output
+PING_LOSS_RE = re.compile(r'(\d+)% packet loss')
+PING_AVG_RE = re.compile(r'avg = ([\d.]+)')
+HOP_RE = re.compile(r'^\s*(\d+)\s+(.+)')
+# Matches either a hop IP address or a round-trip time in one scan
+HOP_FIELDS_RE = re.compile(r'(\d+\.\d+\.\d+\.\d+)|(\d+\.\d+)\s*ms')
+
+# Resolved addresses per hostname, reused across diagnostics runs for _DNS_TTL seconds
+_DNS_CACHE: "OrderedDict[str, Tuple[float, List[str]]]" = OrderedDict()
+_DNS_TTL = 60
+_DNS_CACHE_SIZE = 256
+
+# Seconds to wait for any log source to return logs
+LOG_SOURCE_TIMEOUT = 10
+
+# Elasticsearch results are cached in fixed-size time buckets
+ES_BUCKET_SECONDS = 60
+# Buckets are only cached once they ended this long ago, so late-indexed logs are not lost
+ES_BUCKET_SETTLE_SECONDS = 120
+ES_BUCKET_CACHE_SIZE = 1024
+ES_MAX_HITS = 1000
+
+# Long windows are split into parallel subrange queries
+ES_QUERY_PARALLELISM = 4
+ES_MIN_SUBRANGE_SECONDS = 4 * 60
+
+def tail_lines(path: str, max_lines: int = 1000, chunk_size: int = 64 * 1024,
+               max_bytes: int = 256 * 1024) -> List[str]:
+    """Read the last lines of a file by seeking back from its end"""
+    with open(path, 'rb') as f:
+        position = f.seek(0, os.SEEK_END)
+        data = b''
+
+        # Stop at max_bytes so files with very long lines still cost bounded I/O
+        while position > 0 and len(data) < max_bytes and data.count(b'\n') <= max_lines:
+            read_size = min(chunk_size, position, max_bytes - len(data))
+            position -= read_size
+            f.seek(position)
+            data = f.read(read_size) + data
+
+    lines = data.splitlines()
+    if position > 0:
+        lines = lines[1:]  # First line may start mid-way through a line
+
+    return [line.decode('utf-8', errors='replace') for line in lines[-max_lines:]]
 
 class LogCollector:
     """Collects and analyzes application logs"""
 
-    def __init__(self, config: Dict[str, Any]):
+    def __init__(self, config: Dict[str, Any], session: aiohttp.ClientSession):
         self.config = config
+        self.session = session
         self.logger = Logger.setup_logger("LogCollector")
 
+        self._es_endpoints = self.config.get('elasticsearch_endpoints') or (
+            [self.config['elasticsearch_endpoint']] if self.config.get('elasticsearch_endpoint') else []
+        )
+        self._es_endpoint_counter = itertools.count()
+
+        # Settled Elasticsearch time buckets keyed by (service, bucket id)
+        self._bucket_cache: OrderedDict = OrderedDict()
+
     async def collect_logs(self, service_name: str, endpoint_url: str, minutes_back: int = 15) -> Dict[str, Any]:
         """Collect recent logs for the failing service"""
         try:
@@ -47,19 +131,42 @@ class LogCollector:
                 self._collect_from_file_system
             ]
 
-            for source_func in log_sources:
-                try:
-                    logs = await source_func(service_name, minutes_back)
-                    if logs:
-                        log_data["logs"].extend(logs)
-                        break  # Use first successful source
-                except Exception as e:
-                    self.logger.debug(f"Log source {source_func.__name__} failed: {e}")
-                    continue
+            # Race the sources so a slow or hanging one cannot stall the others
+            tasks = {
+                asyncio.create_task(source_func(service_name, minutes_back)): source_func.__name__
+                for source_func in log_sources
+            }
+            pending = set(tasks)
+            deadline = time.monotonic() + LOG_SOURCE_TIMEOUT
+
+            try:
+                while pending and not log_data["logs"]:
+                    done, pending = await asyncio.wait(
+                        pending,
+                        timeout=max(deadline - time.monotonic(), 0),
+                        return_when=asyncio.FIRST_COMPLETED
+                    )
+                    if not done:
+                        self.logger.debug(f"Log sources timed out: {sorted(tasks[t] for t in pending)}")
+                        break
+
+                    for task in done:
+                        try:
+                            logs = task.result()
+                        except Exception as e:
+                            self.logger.debug(f"Log source {tasks[task]} failed: {e}")
+                            continue
+
+                        if logs:
+                            log_data["logs"].extend(logs)
+                            break  # Use first successful source
+            finally:
+                for task in pending:
+                    task.cancel()
 
             # Analyze collected logs
             if log_data["logs"]:
-                log_data.update(self._analyze_logs(log_data["logs"]))
+                log_data.update(self._analyze_logs(log_data["logs"], service_name))
 
             return log_data
 
@@ -69,31 +176,142 @@ class LogCollector:
 
     async def _collect_from_elasticsearch(self, service_name: str, minutes_back: int) -> List[Dict[str, Any]]:
         """Collect logs from Elasticsearch/ELK stack"""
-        # This would integrate with actual Elasticsearch endpoint
-        es_endpoint = self.config.get('elasticsearch_endpoint')
-        if not es_endpoint:
+        # This would integrate with actual Elasticsearch endpoints
+        if not self._es_endpoints:
             raise Exception("Elasticsearch endpoint not configured")
 
+        now = time.time()
+        window_start = now - minutes_back * 60
+        first_bucket = int(window_start // ES_BUCKET_SECONDS)
+        # Buckets before this one ended at least ES_BUCKET_SETTLE_SECONDS ago
+        settled_bucket = max(first_bucket, int((now - ES_BUCKET_SETTLE_SECONDS) // ES_BUCKET_SECONDS))
+
+        # Settled buckets no longer change, so only fetch from the oldest one
+        # that is not cached yet; recent buckets are always re-fetched
+        fetch_from = next(
+            (bucket_id for bucket_id in range(first_bucket, settled_bucket)
+             if (service_name, bucket_id) not in self._bucket_cache),
+            settled_bucket
+        )
+
+        hits = await self._fetch_elasticsearch(service_name, fetch_from * ES_BUCKET_SECONDS, now)
+
+        # A truncated response may be missing the oldest entries of the span,
+        # so only cache its buckets when everything came back
+        if len(hits) < ES_MAX_HITS:
+            fetched = {}
+            for hit in hits:
+                fetched.setdefault(self._bucket_id(hit), []).append(hit)
+
+            for bucket_id in range(fetch_from, settled_bucket):
+                self._cache_bucket((service_name, bucket_id), fetched.get(bucket_id, []))
+
+        # Hits are newest first; older cached buckets follow in descending order
+        logs = list(hits)
+        for bucket_id in range(fetch_from - 1, first_bucket - 1, -1):
+            if len(logs) >= ES_MAX_HITS:
+                break
+            logs.extend(self._get_cached_bucket((service_name, bucket_id)))
+
+        # The first bucket starts up to a bucket width before the requested window
+        logs = [
+            log for log in logs
+            if (timestamp := self._log_epoch(log)) is None or timestamp >= window_start
+        ]
+        return logs[:ES_MAX_HITS]
+
+    async def _fetch_elasticsearch(self, service_name: str, since: float, until: float) -> List[Dict[str, Any]]:
+        """Fetch logs since the given epoch seconds, splitting long windows into parallel subranges"""
+        if until - since < ES_MIN_SUBRANGE_SECONDS * ES_QUERY_PARALLELISM:
+            return await self._query_elasticsearch(service_name, since)
+
+        step = (until - since) / ES_QUERY_PARALLELISM
+        bounds = [since + step * i for i in range(ES_QUERY_PARALLELISM)]
+
+        # Newest subrange first; the last one stays open-ended to catch late arrivals
+        results = await asyncio.gather(*(
+            self._query_elasticsearch(service_name, start, start + step if i < ES_QUERY_PARALLELISM - 1 else None)
+            for i, start in reversed(list(enumerate(bounds)))
+        ))
+
+        # Each subrange is sorted newest first, so concatenating keeps the order
+        hits = [hit for subrange_hits in results for hit in subrange_hits]
+        return hits[:ES_MAX_HITS]
+
+    async def _query_elasticsearch(self, service_name: str, since: float,
+                                   until: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Fetch logs in the given epoch seconds range from Elasticsearch"""
+        time_range = {"gte": int(since * 1000), "format": "epoch_millis"}
+        if until is not None:
+            time_range["lt"] = int(until * 1000)
+
+        # Filter context skips scoring and lets ES cache the clauses
         query = {
             "query": {
                 "bool": {
-                    "must": [
+                    "filter": [
                         {"term": {"service": service_name}},
-                        {"range": {"@timestamp": {"gte": f"now-{minutes_back}m"}}}
+                        {"range": {"@timestamp": time_range}}
                     ]
                 }
             },
             "sort": [{"@timestamp": {"order": "desc"}}],
-            "size": 1000
+            "size": ES_MAX_HITS,
+            "_source": ["@timestamp", "level", "message", "service"],
+            "track_total_hits": False
         }
 
-        async with aiohttp.ClientSession() as session:
-            async with session.post(f"{es_endpoint}/_search", json=query) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    return [hit["_source"] for hit in data["hits"]["hits"]]
-                else:
-                    raise Exception(f"Elasticsearch query failed: {response.status}")
+        # Spread queries across the configured nodes round-robin
+        es_endpoint = self._es_endpoints[next(self._es_endpoint_counter) % len(self._es_endpoints)]
+
+        async with self.session.post(
+            f"{es_endpoint}/_search",
+            params={"filter_path": "hits.hits._source"},
+            json=query
+        ) as response:
+            if response.status == 200:
+                data = decode_payload(await response.read())
+                # filter_path drops the "hits" key entirely when nothing matched
+                return [hit["_source"] for hit in data.get("hits", {}).get("hits", [])]
+            else:
+                raise Exception(f"Elasticsearch query failed: {response.status}")
+
+    def _log_epoch(self, log: Dict[str, Any]) -> Optional[float]:
+        """Get a log entry's timestamp in epoch seconds"""
+        try:
+            timestamp = datetime.fromisoformat(log['@timestamp'])
+        except (KeyError, TypeError, ValueError):
+            return None
+
+        if timestamp.tzinfo is None:
+            timestamp = timestamp.replace(tzinfo=timezone.utc)
+
+        return timestamp.timestamp()
+
+    def _bucket_id(self, log: Dict[str, Any]) -> Optional[int]:
+        """Get the time bucket a log entry falls into"""
+        timestamp = self._log_epoch(log)
+        if timestamp is None:
+            return None
+
+        return int(timestamp // ES_BUCKET_SECONDS)
+
+    def _get_cached_bucket(self, key: Tuple[str, int]) -> List[Dict[str, Any]]:
+        """Get a cached bucket, marking it as recently used"""
+        logs = self._bucket_cache.get(key)
+        if logs is None:
+            return []
+
+        self._bucket_cache.move_to_end(key)
+        return logs
+
+    def _cache_bucket(self, key: Tuple[str, int], logs: List[Dict[str, Any]]):
+        """Cache a settled bucket, evicting the least recently used ones"""
+        self._bucket_cache[key] = logs
+        self._bucket_cache.move_to_end(key)
+
+        while len(self._bucket_cache) > ES_BUCKET_CACHE_SIZE:
+            self._bucket_cache.popitem(last=False)
 
     async def _collect_from_splunk(self, service_name: str, minutes_back: int) -> List[Dict[str, Any]]:
         """Collect logs from Splunk"""
@@ -104,13 +322,12 @@ class LogCollector:
 
         query = f"search service={service_name} earliest=-{minutes_back}m | head 1000"
 
-        async with aiohttp.ClientSession() as session:
-            async with session.post(
-                f"{splunk_endpoint}/services/search/jobs",
-                data={"search": query}
-            ) as response:
-                # Implement actual Splunk API integration
-                raise Exception("Splunk integration not implemented")
+        async with self.session.post(
+            f"{splunk_endpoint}/services/search/jobs",
+            data={"search": query}
+        ) as response:
+            # Implement actual Splunk API integration
+            raise Exception("Splunk integration not implemented")
 
     async def _collect_from_application_api(self, service_name: str, minutes_back: int) -> List[Dict[str, Any]]:
         """Collect logs from application's log API"""
@@ -125,13 +342,12 @@ class LogCollector:
             "limit": 1000
         }
 
-        async with aiohttp.ClientSession() as session:
-            async with session.get(log_api_url, params=params) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    return data.get('logs', [])
-                else:
-                    raise Exception(f"Log API request failed: {response.status}")
+        async with self.session.get(log_api_url, params=params) as response:
+            if response.status == 200:
+                data = decode_payload(await response.read())
+                return data.get('logs', [])
+            else:
+                raise Exception(f"Log API request failed: {response.status}")
 
     async def _collect_from_file_system(self, service_name: str, minutes_back: int) -> List[Dict[str, Any]]:
         """Collect logs from local file system (fallback)"""
@@ -139,38 +355,33 @@ class LogCollector:
         logs = []
 
         cutoff_time = TimestampUtils.now_utc() - timedelta(minutes=minutes_back)
+        max_lines = self.config.get('max_log_lines', 1000)
+        loop = asyncio.get_running_loop()
 
         for log_path in log_paths:
             try:
                 # This is a simplified implementation
-                result = subprocess.run(
-                    ["tail", "-n", "1000", log_path],
-                    capture_output=True,
-                    text=True,
-                    timeout=30
-                )
-
-                if result.returncode == 0:
-                    lines = result.stdout.strip().split('\n')
-                    for line in lines:
-                        try:
-                            # Parse log line (simplified)
-                            log_entry = {
-                                "timestamp": TimestampUtils.format_timestamp(TimestampUtils.now_utc()),
-                                "message": line,
-                                "source": log_path,
-                                "level": "INFO"
-                            }
-
-                            # Try to extract log level
-                            if "ERROR" in line.upper():
-                                log_entry["level"] = "ERROR"
-                            elif "WARN" in line.upper():
-                                log_entry["level"] = "WARN"
-
-                            logs.append(log_entry)
-                        except Exception:
-                            continue
+                lines = await loop.run_in_executor(None, tail_lines, log_path, max_lines)
+
+                for line in lines:
+                    try:
+                        # Parse log line (simplified)
+                        log_entry = {
+                            "timestamp": TimestampUtils.format_timestamp(TimestampUtils.now_utc()),
+                            "message": line,
+                            "source": log_path,
+                            "level": "INFO"
+                        }
+
+                        # Try to extract log level
+                        if "ERROR" in line.upper():
+                            log_entry["level"] = "ERROR"
+                        elif "WARN" in line.upper():
+                            log_entry["level"] = "WARN"
+
+                        logs.append(log_entry)
+                    except Exception:
+                        continue
 
             except Exception as e:
                 self.logger.debug(f"Failed to read log file {log_path}: {e}")
@@ -178,33 +389,38 @@ class LogCollector:
 
         return logs
 
-    def _analyze_logs(self, logs: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def _analyze_logs(self, logs: List[Dict[str, Any]], service_name: str) -> Dict[str, Any]:
         """Analyze collected logs for patterns"""
-        error_count = sum(1 for log in logs if log.get('level') == 'ERROR')
-        warning_count = sum(1 for log in logs if log.get('level') == 'WARN')
+        # Services may override the default error keywords in config
+        keywords = self.config.get('service_error_keywords', {}).get(service_name)
+        error_regex = keywords_regex(keywords) if keywords else ERROR_KEYWORDS_RE
 
-        # Common error patterns
+        error_count = 0
+        warning_count = 0
         error_patterns = []
-        error_keywords = [
-            'connection refused', 'timeout', 'out of memory',
-            'database error', 'null pointer', 'stack overflow',
-            'authentication failed', 'authorization failed'
-        ]
 
+        # Count levels and collect error patterns in a single pass
         for log in logs:
-            message = log.get('message', '').lower()
-            for keyword in error_keywords:
-                if keyword in message:
+            level = log.get('level')
+            if level == 'ERROR':
+                error_count += 1
+            elif level == 'WARN':
+                warning_count += 1
+
+            if len(error_patterns) < 10:  # Limit to top 10 patterns
+                message = log.get('message', '')
+                match = error_regex.search(message)
+                if match:
                     error_patterns.append({
-                        "pattern": keyword,
+                        "pattern": match.group(0).lower(),
                         "timestamp": log.get('timestamp'),
-                        "message": log.get('message')[:200]  # Truncate for readability
+                        "message": message[:200]  # Truncate for readability
                     })
 
         return {
             "error_count": error_count,
             "warning_count": warning_count,
-            "error_patterns": error_patterns[:10]  # Limit to top 10 patterns
+            "error_patterns": error_patterns
         }
 
 class NetworkDiagnostics:
@@ -212,6 +428,7 @@ class NetworkDiagnostics:
 
     def __init__(self):
         self.logger = Logger.setup_logger("NetworkDiagnostics")
+        self._resolver = None  # aiodns resolver, created on first use
 
     async def run_diagnostics(self, endpoint_url: str) -> Dict[str, Any]:
         """Run comprehensive network diagnostics"""
@@ -237,15 +454,19 @@ class NetworkDiagnostics:
                 ("ssl_certificate", self._test_ssl_certificate(hostname, port) if port == 443 else None)
             ]
 
-            for test_name, task in test_tasks:
-                if task:
-                    try:
-                        result = await asyncio.wait_for(task, timeout=30)
-                        diagnostics["tests"][test_name] = result
-                    except asyncio.TimeoutError:
-                        diagnostics["tests"][test_name] = {"status": "timeout", "error": "Test timed out"}
-                    except Exception as e:
-                        diagnostics["tests"][test_name] = {"status": "error", "error": str(e)}
+            test_tasks = [(test_name, task) for test_name, task in test_tasks if task]
+            results = await asyncio.gather(
+                *(asyncio.wait_for(task, timeout=30) for _, task in test_tasks),
+                return_exceptions=True
+            )
+
+            for (test_name, _), result in zip(test_tasks, results):
+                if isinstance(result, asyncio.TimeoutError):
+                    diagnostics["tests"][test_name] = {"status": "timeout", "error": "Test timed out"}
+                elif isinstance(result, Exception):
+                    diagnostics["tests"][test_name] = {"status": "error", "error": str(result)}
+                else:
+                    diagnostics["tests"][test_name] = result
 
             return diagnostics
 
@@ -268,8 +489,8 @@ class NetworkDiagnostics:
             if process.returncode == 0:
                 # Parse ping output
                 output = stdout.decode()
-                packet_loss_match = re.search(r'(\d+)% packet loss', output)
-                avg_time_match = re.search(r'avg = ([\d.]+)', output)
+                packet_loss_match = PING_LOSS_RE.search(output)
+                avg_time_match = PING_AVG_RE.search(output)
 
                 return {
                     "status": "success",
@@ -321,16 +542,9 @@ class NetworkDiagnostics:
     async def _test_port_connectivity(self, hostname: str, port: int) -> Dict[str, Any]:
         """Test TCP port connectivity"""
         try:
-            start_time = time.time()
-
-            # Try to connect to the port
-            future = asyncio.open_connection(hostname, port)
-            reader, writer = await asyncio.wait_for(future, timeout=10)
-
-            connection_time = (time.time() - start_time) * 1000
-
-            writer.close()
-            await writer.wait_closed()
+            start_time = time.perf_counter()
+            await asyncio.wait_for(self._connect_socket(hostname, port), timeout=10)
+            connection_time = (time.perf_counter() - start_time) * 1000
 
             return {
                 "status": "success",
@@ -351,23 +565,71 @@ class NetworkDiagnostics:
                 "port_open": False
             }
 
+    @staticmethod
+    async def _connect_socket(hostname: str, port: int):
+        """Open and close a bare TCP socket to each resolved address until one connects"""
+        loop = asyncio.get_running_loop()
+        addresses = await loop.getaddrinfo(hostname, port, type=socket.SOCK_STREAM)
+
+        last_error = None
+        for family, sock_type, proto, _, sockaddr in addresses:
+            # Use the resolved family so IPv6-only hosts are reachable too
+            sock = socket.socket(family, sock_type, proto)
+            sock.setblocking(False)
+            try:
+                await loop.sock_connect(sock, sockaddr)
+                return
+            except OSError as e:
+                last_error = e
+            finally:
+                sock.close()
+
+        raise last_error or OSError(f"No addresses found for {hostname}")
+
     async def _test_dns_resolution(self, hostname: str) -> Dict[str, Any]:
         """Test DNS resolution"""
         try:
+            cached = _DNS_CACHE.get(hostname)
+            if cached and time.monotonic() - cached[0] < _DNS_TTL:
+                _DNS_CACHE.move_to_end(hostname)
+                return {
+                    "status": "success",
+                    "ip_addresses": cached[1],
+                    "resolution_time_ms": 0.0,
+                    "cached": True
+                }
+
             start_time = time.time()
 
-            # Resolve hostname
-            loop = asyncio.get_event_loop()
-            addresses = await loop.getaddrinfo(hostname, None)
-            resolution_time = (time.time() - start_time) * 1000
+            # Prefer parallel A/AAAA queries; fall back to the system resolver
+            # when aiodns is missing or DNS has no records (e.g. /etc/hosts names)
+            records = await self._query_address_records(hostname)
+            ip_addresses = [
+                address for record in (records or {}).values()
+                for address in record.get("addresses", [])
+            ]
 
-            ip_addresses = list(set([addr[4][0] for addr in addresses]))
+            if not ip_addresses:
+                loop = asyncio.get_event_loop()
+                addresses = await loop.getaddrinfo(hostname, None)
+                ip_addresses = list(set([addr[4][0] for addr in addresses]))
 
-            return {
+            resolution_time = (time.time() - start_time) * 1000
+            _DNS_CACHE[hostname] = (time.monotonic(), ip_addresses)
+            _DNS_CACHE.move_to_end(hostname)
+            while len(_DNS_CACHE) > _DNS_CACHE_SIZE:
+                _DNS_CACHE.popitem(last=False)
+
+            result = {
                 "status": "success",
                 "ip_addresses": ip_addresses,
-                "resolution_time_ms": round(resolution_time, 2)
+                "resolution_time_ms": round(resolution_time, 2),
+                "cached": False
             }
+            if records:
+                result["records"] = records
+
+            return result
 
         except Exception as e:
             return {
@@ -375,31 +637,64 @@ class NetworkDiagnostics:
                 "error": str(e)
             }
 
+    async def _query_address_records(self, hostname: str) -> Optional[Dict[str, Dict[str, Any]]]:
+        """Query A and AAAA records concurrently with aiodns"""
+        try:
+            import aiodns
+        except ImportError:
+            return None
+
+        if self._resolver is None:
+            self._resolver = aiodns.DNSResolver()
+
+        async def query(record_type: str) -> Dict[str, Any]:
+            start_time = time.perf_counter()
+            try:
+                answers = await self._resolver.query(hostname, record_type)
+            except aiodns.error.DNSError as e:
+                return {"status": "failed", "error": str(e)}
+
+            return {
+                "status": "success",
+                "addresses": [answer.host for answer in answers],
+                "query_time_ms": round((time.perf_counter() - start_time) * 1000, 2)
+            }
+
+        ipv4, ipv6 = await asyncio.gather(query('A'), query('AAAA'))
+        return {"A": ipv4, "AAAA": ipv6}
+
     async def _test_ssl_certificate(self, hostname: str, port: int) -> Dict[str, Any]:
         """Test SSL certificate"""
         try:
             import ssl
-            import socket
 
             context = ssl.create_default_context()
 
-            with socket.create_connection((hostname, port), timeout=10) as sock:
-                with context.wrap_socket(sock, server_hostname=hostname) as secure_sock:
-                    cert = secure_sock.getpeercert()
-
-                    # Parse certificate
-                    expiry_date = datetime.strptime(cert['notAfter'], '%b %d %H:%M:%S %Y %Z')
-                    expiry_date = expiry_date.replace(tzinfo=timezone.utc)
-                    days_until_expiry = (expiry_date - TimestampUtils.now_utc()).days
-
-                    return {
-                        "status": "success",
-                        "subject": dict(x[0] for x in cert['subject']),
-                        "issuer": dict(x[0] for x in cert['issuer']),
-                        "not_after": cert['notAfter'],
-                        "days_until_expiry": days_until_expiry,
-                        "version": cert['version']
-                    }
+            # Handshake on the event loop so other diagnostics keep running
+            reader, writer = await asyncio.wait_for(
+                asyncio.open_connection(hostname, port, ssl=context, server_hostname=hostname),
+                timeout=10
+            )
+
+            try:
+                cert = writer.get_extra_info('peercert')
+            finally:
+                writer.close()
+                await writer.wait_closed()
+
+            # Parse certificate
+            expiry_date = datetime.strptime(cert['notAfter'], '%b %d %H:%M:%S %Y %Z')
+            expiry_date = expiry_date.replace(tzinfo=timezone.utc)
+            days_until_expiry = (expiry_date - TimestampUtils.now_utc()).days
+
+            return {
+                "status": "success",
+                "subject": dict(x[0] for x in cert['subject']),
+                "issuer": dict(x[0] for x in cert['issuer']),
+                "not_after": cert['notAfter'],
+                "days_until_expiry": days_until_expiry,
+                "version": cert['version']
+            }
 
         except Exception as e:
             return {
@@ -414,20 +709,26 @@ class NetworkDiagnostics:
 
         for line in lines[1:]:  # Skip first line (traceroute header)
             # Parse each hop line
-            hop_match = re.match(r'^\s*(\d+)\s+(.+)', line)
+            hop_match = HOP_RE.match(line)
             if hop_match:
                 hop_number = int(hop_match.group(1))
                 rest = hop_match.group(2)
 
-                # Extract IP addresses and times
-                ip_match = re.search(r'(\d+\.\d+\.\d+\.\d+)', rest)
-                time_matches = re.findall(r'(\d+\.\d+)\s*ms', rest)
+                # Extract the first IP address and all times in a single pass
+                ip_address = None
+                times_ms = []
+                for ip_match, time_match in HOP_FIELDS_RE.findall(rest):
+                    if ip_match:
+                        if ip_address is None:
+                            ip_address = ip_match
+                    else:
+                        times_ms.append(float(time_match))
 
                 hops.append({
                     "hop": hop_number,
-                    "ip_address": ip_match.group(1) if ip_match else None,
-                    "times_ms": [float(t) for t in time_matches],
-                    "status": "success" if time_matches else "timeout"
+                    "ip_address": ip_address,
+                    "times_ms": times_ms,
+                    "status": "success" if times_ms else "timeout"
                 })
 
         return hops
@@ -435,9 +736,13 @@ class NetworkDiagnostics:
 class SystemMetricsCollector:
     """Collect system metrics for troubleshooting"""
 
-    def __init__(self):
+    def __init__(self, session: aiohttp.ClientSession):
+        self.session = session
         self.logger = Logger.setup_logger("SystemMetricsCollector")
 
+        if psutil is not None:
+            psutil.cpu_percent(interval=None)  # Prime the baseline for later non-blocking samples
+
     async def collect_metrics(self, service_name: str) -> Dict[str, Any]:
         """Collect system metrics for the failing service"""
         try:
@@ -463,18 +768,23 @@ class SystemMetricsCollector:
     async def _collect_system_metrics(self) -> Dict[str, Any]:
         """Collect general system metrics"""
         try:
-            # Use system commands to collect metrics
-            cpu_usage = await self._get_cpu_usage()
-            memory_usage = await self._get_memory_usage()
-            disk_usage = await self._get_disk_usage()
-            load_average = await self._get_load_average()
+            keys = ("cpu_usage_percent", "memory_usage_percent", "disk_usage_percent", "load_average")
+            results = await asyncio.gather(
+                self._get_cpu_usage(),
+                self._get_memory_usage(),
+                self._get_disk_usage(),
+                self._get_load_average(),
+                return_exceptions=True
+            )
 
-            return {
-                "cpu_usage_percent": cpu_usage,
-                "memory_usage_percent": memory_usage,
-                "disk_usage_percent": disk_usage,
-                "load_average": load_average
-            }
+            metrics = {}
+            for key, result in zip(keys, results):
+                if isinstance(result, Exception):
+                    self.logger.warning(f"Failed to collect {key}: {result}")
+                    result = {"1min": 0.0, "5min": 0.0, "15min": 0.0} if key == "load_average" else 0.0
+                metrics[key] = result
+
+            return metrics
 
         except Exception as e:
             self.logger.error(f"Failed to collect system metrics: {e}")
@@ -489,14 +799,13 @@ class SystemMetricsCollector:
             # Try to get metrics from service's metrics endpoint
             metrics_endpoint = f"http://{service_name}:8080/metrics"
 
-            async with aiohttp.ClientSession() as session:
-                try:
-                    async with session.get(metrics_endpoint, timeout=10) as response:
-                        if response.status == 200:
-                            metrics_text = await response.text()
-                            service_metrics = self._parse_prometheus_metrics(metrics_text)
-                except:
-                    pass  # Metrics endpoint not available
+            try:
+                async with self.session.get(metrics_endpoint, timeout=10) as response:
+                    if response.status == 200:
+                        metrics_text = await response.text()
+                        service_metrics = self._parse_prometheus_metrics(metrics_text)
+            except:
+                pass  # Metrics endpoint not available
 
             return service_metrics
 
@@ -507,21 +816,20 @@ class SystemMetricsCollector:
     async def _get_cpu_usage(self) -> float:
         """Get CPU usage percentage"""
         try:
-            process = await asyncio.create_subprocess_exec(
-                'top', '-bn1', '-p', '1',
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
-            )
+            if psutil is not None:
+                return psutil.cpu_percent(interval=None)
 
-            stdout, _ = await process.communicate()
-            output = stdout.decode()
+            # Sample /proc/stat twice and compare busy time against total time
+            idle_before, total_before = self._read_cpu_times()
+            await asyncio.sleep(0.1)
+            idle_after, total_after = self._read_cpu_times()
 
-            # Parse CPU usage from top output
-            cpu_match = re.search(r'%Cpu\(s\):\s+([\d.]+)\s+us', output)
-            if cpu_match:
-                return float(cpu_match.group(1))
+            total_delta = total_after - total_before
+            if total_delta <= 0:
+                return 0.0
 
-            return 0.0
+            idle_delta = idle_after - idle_before
+            return round((1 - idle_delta / total_delta) * 100, 1)
 
         except Exception:
             return 0.0
@@ -529,25 +837,18 @@ class SystemMetricsCollector:
     async def _get_memory_usage(self) -> float:
         """Get memory usage percentage"""
         try:
-            process = await asyncio.create_subprocess_exec(
-                'free', '-m',
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
-            )
-
-            stdout, _ = await process.communicate()
-            output = stdout.decode()
+            if psutil is not None:
+                return psutil.virtual_memory().percent
 
-            # Parse memory usage
-            lines = output.strip().split('\n')
-            if len(lines) >= 2:
-                memory_line = lines[1].split()
-                if len(memory_line) >= 3:
-                    total = int(memory_line[1])
-                    used = int(memory_line[2])
-                    return (used / total) * 100
+            meminfo = {}
+            with open('/proc/meminfo') as f:
+                for line in f:
+                    key, value = line.split(':', 1)
+                    meminfo[key] = int(value.split()[0])
 
-            return 0.0
+            total = meminfo['MemTotal']
+            available = meminfo['MemAvailable']
+            return round((total - available) / total * 100, 1)
 
         except Exception:
             return 0.0
@@ -555,24 +856,11 @@ class SystemMetricsCollector:
     async def _get_disk_usage(self) -> float:
         """Get disk usage percentage"""
         try:
-            process = await asyncio.create_subprocess_exec(
-                'df', '-h', '/',
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
-            )
-
-            stdout, _ = await process.communicate()
-            output = stdout.decode()
+            if psutil is not None:
+                return psutil.disk_usage('/').percent
 
-            # Parse disk usage
-            lines = output.strip().split('\n')
-            if len(lines) >= 2:
-                disk_line = lines[1].split()
-                if len(disk_line) >= 5:
-                    usage_str = disk_line[4].replace('%', '')
-                    return float(usage_str)
-
-            return 0.0
+            stats = os.statvfs('/')
+            return round((1 - stats.f_bavail / stats.f_blocks) * 100, 1)
 
         except Exception:
             return 0.0
@@ -580,42 +868,43 @@ class SystemMetricsCollector:
     async def _get_load_average(self) -> Dict[str, float]:
         """Get system load average"""
         try:
-            process = await asyncio.create_subprocess_exec(
-                'uptime',
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
-            )
-
-            stdout, _ = await process.communicate()
-            output = stdout.decode()
-
-            # Parse load average
-            load_match = re.search(r'load average: ([\d.]+), ([\d.]+), ([\d.]+)', output)
-            if load_match:
-                return {
-                    "1min": float(load_match.group(1)),
-                    "5min": float(load_match.group(2)),
-                    "15min": float(load_match.group(3))
-                }
-
-            return {"1min": 0.0, "5min": 0.0, "15min": 0.0}
+            getloadavg = psutil.getloadavg if psutil is not None else os.getloadavg
+            load_1, load_5, load_15 = getloadavg()
+            return {
+                "1min": load_1,
+                "5min": load_5,
+                "15min": load_15
+            }
 
         except Exception:
             return {"1min": 0.0, "5min": 0.0, "15min": 0.0}
 
+    def _read_cpu_times(self) -> Tuple[int, int]:
+        """Read aggregate idle and total CPU jiffies from /proc/stat"""
+        with open('/proc/stat') as f:
+            fields = [int(value) for value in f.readline().split()[1:9]]
+
+        # user nice system idle iowait irq softirq steal
+        idle = fields[3] + fields[4]
+        return idle, sum(fields)
+
     def _parse_prometheus_metrics(self, metrics_text: str) -> Dict[str, Any]:
         """Parse Prometheus metrics format"""
         metrics = {}
 
-        for line in metrics_text.strip().split('\n'):
-            line = line.strip()
-            if line and not line.startswith('#'):
-                if ' ' in line:
-                    metric_name, value = line.split(' ', 1)
-                    try:
-                        metrics[metric_name] = float(value)
-                    except ValueError:
-                        continue
+        for line in metrics_text.splitlines():
+            if not line or line[0] == '#':
+                continue
+
+            # The sample value is always the last token, even when labels contain spaces
+            separator = line.rfind(' ')
+            if separator < 0:
+                continue
+
+            try:
+                metrics[line[:separator]] = float(line[separator + 1:])
+            except ValueError:
+                continue
 
         return metrics
 
@@ -623,19 +912,33 @@ class TriageAgent:
     """Main triage agent that orchestrates diagnostic data collection"""
 
     def __init__(self):
-        self.config_manager = ConfigManager()
+        self.config_manager = get_config_manager()
         self.logger = Logger.setup_logger("TriageAgent")
         self.communication = create_agent_communication("triage")
 
+        # Shared HTTP connection pool for all diagnostic collectors
+        self.http_session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                limit=64,
+                limit_per_host=16,
+                ttl_dns_cache=300,
+                keepalive_timeout=60
+            )
+        )
+
         # Initialize data collectors
         self.triage_config = self.config_manager.get_agent_config("triage")
-        self.log_collector = LogCollector(self.triage_config)
+        self.log_collector = LogCollector(self.triage_config, session=self.http_session)
         self.network_diagnostics = NetworkDiagnostics()
-        self.metrics_collector = SystemMetricsCollector()
+        self.metrics_collector = SystemMetricsCollector(session=self.http_session)
+        self.database_diagnostics = DatabaseDiagnostics(self.triage_config)
 
         # Register message handler
         get_message_queue().register_handler("triage", self._handle_message)
 
+        # Set by the message queue whenever a message for this agent arrives
+        self._wake = asyncio.Event()
+
         self.logger.info("Triage agent initialized")
 
     async def _handle_message(self, message: Message):
@@ -819,12 +1122,22 @@ class TriageAgent:
         """Start the triage agent"""
         self.logger.info("Triage agent started - waiting for triage requests")
 
+        # Senders may run on other threads, so hop onto this loop to signal
+        loop = asyncio.get_running_loop()
+        get_message_queue().register_wakeup("triage", lambda: loop.call_soon_threadsafe(self._wake.set))
+
         # Keep the agent running and processing messages
         while True:
             try:
                 # Process any pending messages
                 self.communication.process_messages()
-                await asyncio.sleep(1)
+
+                # Sleep until a message arrives, with a periodic heartbeat as a fallback
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout=30)
+                except asyncio.TimeoutError:
+                    pass
+                self._wake.clear()
 
             except KeyboardInterrupt:
                 self.logger.info("Triage agent stopped")
@@ -833,11 +1146,25 @@ class TriageAgent:
                 self.logger.error(f"Error in triage agent main loop: {e}")
                 await asyncio.sleep(5)
 
+    async def aclose(self):
+        """Release the shared HTTP and database connection pools"""
+        # The wakeup callback targets this agent's loop, which is about to go away
+        get_message_queue().unregister_wakeup("triage")
+
+        # Redis pools are bound to this loop, so they must be closed before it stops
+        await self.database_diagnostics.aclose()
+
+        if not self.http_session.closed:
+            await self.http_session.close()
+
 # Main execution function for Compyle platform
 async def main():
     """Main entry point for triage agent"""
     agent = TriageAgent()
-    await agent.start()
+    try:
+        await agent.start()
+    finally:
+        await agent.aclose()
 
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file
@@ -5,21 +5,148 @@ Sets up the environment for deploying DevOps Sentinel on the Compyle platform
 """
 
 import os
+import re
 import sys
 import json
+import asyncio
+import hashlib
+import itertools
 import yaml
 import subprocess
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
+
+try:
+    from yaml import CSafeLoader as SafeLoader
+    YAML_BACKEND = "libyaml"
+except ImportError:
+    from yaml import SafeLoader
+    YAML_BACKEND = "pure-Python"
+
+# KEY=value assignments; comment lines never match because keys cannot start with '#'
+ENV_ASSIGNMENT_RE = re.compile(rb'(?m)^[ \t]*([A-Za-z_][A-Za-z0-9_]*)[ \t]*=[ \t]*(.*?)[ \t\r]*$')
+
+REQUIREMENT_NAME_RE = re.compile(r'[A-Za-z0-9][A-Za-z0-9._-]*')
+
+def _supported_wheel_tags() -> set:
+    """Return the wheel tags this interpreter can install"""
+    try:
+        from packaging.tags import sys_tags
+    except ImportError:
+        try:
+            from pip._vendor.packaging.tags import sys_tags
+        except ImportError:
+            return {"py3-none-any"}
+    return {str(tag) for tag in sys_tags()}
+
+def _wheel_matches(filename: str, tags: set) -> bool:
+    """Check whether any expanded tag of a wheel filename is supported"""
+    python_tags, abi_tags, platform_tags = filename[:-len(".whl")].split("-")[-3:]
+    return any(
+        f"{python}-{abi}-{platform}" in tags
+        for python, abi, platform in itertools.product(
+            python_tags.split("."), abi_tags.split("."), platform_tags.split(".")
+        )
+    )
+
+AGENT_NAMES = ("monitoring", "triage", "analysis", "notification")
+
+DOCKER_COMPOSE_TEMPLATE = """version: '3.8'
+services:
+{services}volumes:
+  devops-sentinel-data: {{}}
+  devops-sentinel-logs: {{}}
+"""
+
+DOCKER_COMPOSE_SERVICE_TEMPLATE = """  {agent}-agent:
+    build:
+      context: .
+      dockerfile: Dockerfile.{agent}
+    environment:
+    - AGENT_NAME={agent}
+    - PYTHONPATH=/workspace
+    volumes:
+    - ./config:/workspace/config:ro
+    - ./data:/workspace/data
+    - ./logs:/workspace/logs
+    restart: unless-stopped
+"""
+
+K8S_NAMESPACE_MANIFEST = """apiVersion: v1
+kind: Namespace
+metadata:
+  name: devops-sentinel
+"""
+
+K8S_CONFIGMAP_TEMPLATE = """apiVersion: v1
+kind: ConfigMap
+metadata:
+  name: devops-sentinel-config
+  namespace: devops-sentinel
+data:
+  agents.yaml: {agents}
+  endpoints.yaml: {endpoints}
+"""
+
+def _yaml_block(text: str) -> str:
+    """Render text as a literal block scalar for a key nested two spaces deep"""
+    chomp = "+" if text.endswith("\n\n") else "" if text.endswith("\n") else "-"
+    # The template supplies the newline that terminates the last line
+    lines = "".join(f"    {line}" for line in text.splitlines(keepends=True)).removesuffix("\n")
+    return f"|2{chomp}\n{lines}"
+
+def _write_file(path: Path, data: bytes, mode: Optional[int] = None):
+    """Write bytes through a raw descriptor, setting mode on new and existing files alike"""
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | os.O_CLOEXEC, 0o666)
+    try:
+        # The os.open mode is masked by umask and ignored for existing files
+        if mode is not None:
+            os.fchmod(fd, mode)
+
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
 
 class EnvironmentSetup:
     """Handle environment setup for DevOps Sentinel deployment"""
 
+    REQUIRED_FILES = (
+        "config/agents.yaml",
+        "config/endpoints.yaml",
+        "deployment/compyle_workflows.yaml",
+        "requirements.txt"
+    )
+
+    AGENT_FILES = (
+        "agents/monitoring/health_check.py",
+        "agents/triage/data_collector.py",
+        "agents/analysis/llm_analyzer.py",
+        "agents/notification/delivery_service.py"
+    )
+
     def __init__(self):
         self.project_root = Path(__file__).parent.parent
         self.config_dir = self.project_root / "config"
         self.deployment_dir = self.project_root / "deployment"
 
+        # Every file the setup touches, joined once
+        self._paths: Dict[str, Path] = {
+            "agents": self.config_dir / "agents.yaml",
+            "endpoints": self.config_dir / "endpoints.yaml",
+            "workflows": self.deployment_dir / "compyle_workflows.yaml",
+            "requirements": self.project_root / "requirements.txt",
+            "env": self.project_root / ".env",
+            "env_template": self.project_root / ".env.template",
+            "wheelhouse": self.project_root / "temp" / "wheels",
+            "docker_compose": self.deployment_dir / "docker-compose.yml",
+            "kubernetes": self.deployment_dir / "kubernetes",
+            "scripts": self.deployment_dir / "scripts"
+        }
+        self.yaml_backend = YAML_BACKEND
+        self._yaml_cache: Dict[Path, Tuple[bytes, Any]] = {}
+
         # Required environment variables
         self.required_env_vars = {
             # Core configuration
@@ -53,6 +180,7 @@ class EnvironmentSetup:
     def setup_environment(self) -> bool:
         """Set up the complete environment"""
         print("🚀 Setting up DevOps Sentinel environment...")
+        print(f"   YAML backend: {self.yaml_backend}")
 
         try:
             # Step 1: Create required directories
@@ -94,9 +222,19 @@ class EnvironmentSetup:
             "backups"
         ]
 
-        for directory in directories:
+        # Parents sort first; children of freshly created parents cannot exist yet
+        listings: Dict[str, set] = {}
+        created = set()
+
+        for directory in sorted(directories, key=lambda d: d.count("/")):
             dir_path = self.project_root / directory
+            parent, _, name = directory.rpartition("/")
+            if parent not in created and name in self._list_dir(parent, listings):
+                print(f"   Exists: {dir_path}")
+                continue
+
             dir_path.mkdir(parents=True, exist_ok=True)
+            created.add(directory)
             print(f"   Created: {dir_path}")
 
     def _install_dependencies(self):
@@ -106,13 +244,18 @@ class EnvironmentSetup:
         # Create requirements.txt
         requirements = [
             "aiohttp>=3.8.0",
+            "aiodns>=3.0.0",
             "asyncio",
             "pyyaml>=6.0",
+            "orjson>=3.8.0",
             "requests>=2.28.0",
             "psycopg2-binary>=2.9.0",
             "redis>=4.3.0",
             "pymongo>=4.2.0",
+            "docker>=6.0.0",
+            "kubernetes>=25.0.0",
             "prometheus-client>=0.15.0",
+            "psutil>=5.9.0",
             "python-dotenv>=0.19.0",
             "email-validator>=1.3.0",
             "jinja2>=3.1.0",
@@ -120,30 +263,111 @@ class EnvironmentSetup:
             "rich>=12.0.0"
         ]
 
-        requirements_file = self.project_root / "requirements.txt"
-        with open(requirements_file, 'w') as f:
-            f.write('\n'.join(requirements))
+        requirements_file = self._paths["requirements"]
+        _write_file(requirements_file, '\n'.join(requirements).encode())
+
+        # Install dependencies: download wheels concurrently, then install them in one pip run
+        pip = [sys.executable, "-m", "pip", "install"]
+        env = {**os.environ, "PIP_DISABLE_PIP_VERSION_CHECK": "1"}
+
+        wheelhouse = self._prefetch_wheels(requirements)
+        if wheelhouse:
+            pip += ["--find-links", str(wheelhouse)]
 
-        # Install dependencies
         try:
-            subprocess.run([
-                sys.executable, "-m", "pip", "install", "-r", str(requirements_file)
-            ], check=True, capture_output=True)
+            # A single pip process writes site-packages; concurrent installs would race there
+            subprocess.run(pip + ["-r", str(requirements_file)],
+                           check=True, capture_output=True, env=env)
             print("   ✅ Dependencies installed successfully")
         except subprocess.CalledProcessError as e:
             print(f"   ⚠️  Warning: Could not install dependencies: {e}")
             print("   You may need to install them manually")
 
+    def _prefetch_wheels(self, requirements: List[str]) -> Optional[Path]:
+        """Download matching wheels concurrently into a local wheelhouse for pip"""
+        try:
+            import aiohttp
+        except ImportError:
+            return None
+
+        wheelhouse = self._paths["wheelhouse"]
+        wheelhouse.mkdir(parents=True, exist_ok=True)
+
+        try:
+            fetched = asyncio.run(self._fetch_wheels(aiohttp, requirements, wheelhouse))
+        except Exception as e:
+            print(f"   ⚠️  Warning: Could not prefetch wheels: {e}")
+            return None
+
+        print(f"   ✅ Prefetched {fetched} wheels into {wheelhouse}")
+        return wheelhouse
+
+    async def _fetch_wheels(self, aiohttp, requirements: List[str], wheelhouse: Path) -> int:
+        """Fetch one compatible wheel per requirement from PyPI in parallel"""
+        tags = _supported_wheel_tags()
+        timeout = aiohttp.ClientTimeout(total=120)
+        async with aiohttp.ClientSession(timeout=timeout) as session:
+            results = await asyncio.gather(
+                *(self._fetch_wheel(session, requirement, wheelhouse, tags) for requirement in requirements),
+                return_exceptions=True
+            )
+        return sum(1 for result in results if result is True)
+
+    async def _fetch_wheel(self, session, requirement: str, wheelhouse: Path, tags: set) -> bool:
+        """Download the latest compatible wheel for a requirement, if PyPI has one"""
+        name = REQUIREMENT_NAME_RE.match(requirement).group(0)
+        async with session.get(f"https://pypi.org/pypi/{name}/json") as response:
+            if response.status != 200:
+                return False
+            release = await response.json()
+
+        for file_info in release.get("urls", []):
+            filename = file_info["filename"]
+            if file_info.get("packagetype") != "bdist_wheel" or not _wheel_matches(filename, tags):
+                continue
+
+            # Trust neither a cached file by name nor the download until the digest matches
+            expected = file_info["digests"]["sha256"]
+            target = wheelhouse / filename
+            if target.exists() and hashlib.sha256(target.read_bytes()).hexdigest() == expected:
+                return True
+
+            async with session.get(file_info["url"]) as response:
+                response.raise_for_status()
+                data = await response.read()
+            if hashlib.sha256(data).hexdigest() != expected:
+                raise ValueError(f"sha256 mismatch for {filename}")
+
+            partial = target.with_name(filename + ".part")
+            _write_file(partial, data)
+            os.replace(partial, target)
+            return True
+
+        return False
+
+    def _load_yaml(self, path: Path) -> Any:
+        """Read and parse a YAML file once, caching raw bytes and parsed config"""
+        cached = self._yaml_cache.get(path)
+        if cached is None:
+            data = path.read_bytes()
+            cached = (data, yaml.load(data, Loader=SafeLoader))
+            self._yaml_cache[path] = cached
+        return cached[1]
+
+    def _read_yaml_text(self, path: Path) -> str:
+        """Return the raw text of a YAML file, reusing the parse cache"""
+        self._load_yaml(path)
+        return self._yaml_cache[path][0].decode()
+
     def _validate_configurations(self):
         """Validate configuration files"""
         print("⚙️  Validating configuration files...")
 
         # Validate endpoints configuration
-        endpoints_file = self.config_dir / "endpoints.yaml"
+        endpoints_file = self._paths["endpoints"]
         if endpoints_file.exists():
             try:
-                with open(endpoints_file, 'r') as f:
-                    endpoints_config = yaml.safe_load(f)
+                endpoints_config = self._load_yaml(endpoints_file)
 
                 if 'endpoints' in endpoints_config:
                     endpoint_count = len(endpoints_config['endpoints'])
@@ -157,11 +381,10 @@ class EnvironmentSetup:
             print("   ⚠️  Warning: endpoints.yaml not found")
 
         # Validate agents configuration
-        agents_file = self.config_dir / "agents.yaml"
+        agents_file = self._paths["agents"]
         if agents_file.exists():
             try:
-                with open(agents_file, 'r') as f:
-                    agents_config = yaml.safe_load(f)
+                agents_config = self._load_yaml(agents_file)
 
                 if 'agents' in agents_config:
                     agent_count = len(agents_config['agents'])
@@ -175,11 +398,10 @@ class EnvironmentSetup:
             print("   ⚠️  Warning: agents.yaml not found")
 
         # Validate Compyle workflows
-        workflows_file = self.deployment_dir / "compyle_workflows.yaml"
+        workflows_file = self._paths["workflows"]
         if workflows_file.exists():
             try:
-                with open(workflows_file, 'r') as f:
-                    workflows_config = yaml.safe_load(f)
+                workflows_config = self._load_yaml(workflows_file)
 
                 if 'workflows' in workflows_config:
                     workflow_count = len(workflows_config['workflows'])
@@ -197,24 +419,23 @@ class EnvironmentSetup:
         print("🔧 Setting up environment variables...")
 
         # Create .env file template
-        env_file = self.project_root / ".env"
-        env_template_file = self.project_root / ".env.template"
+        env_file = self._paths["env"]
+        env_template_file = self._paths["env_template"]
 
-        env_content = "# DevOps Sentinel Environment Variables\n"
-        env_content += "# Copy this file to .env and fill in your values\n\n"
+        parts = [
+            "# DevOps Sentinel Environment Variables\n",
+            "# Copy this file to .env and fill in your values\n\n"
+        ]
 
         missing_vars = []
 
         for var_name, default_value in self.required_env_vars.items():
             if default_value is None:
-                env_content += f"{var_name}=\n"
                 missing_vars.append(var_name)
-            else:
-                env_content += f"{var_name}={default_value}\n"
+            parts.append(f"{var_name}={default_value or ''}\n")
 
         # Write template file
-        with open(env_template_file, 'w') as f:
-            f.write(env_content)
+        _write_file(env_template_file, ''.join(parts).encode())
 
         # Check if .env file exists
         if env_file.exists():
@@ -230,16 +451,11 @@ class EnvironmentSetup:
     def _validate_env_file(self, env_file: Path):
         """Validate existing .env file"""
         try:
-            with open(env_file, 'r') as f:
-                env_content = f.read()
-
-            # Parse environment variables
-            env_vars = {}
-            for line in env_content.split('\n'):
-                line = line.strip()
-                if line and not line.startswith('#') and '=' in line:
-                    key, value = line.split('=', 1)
-                    env_vars[key.strip()] = value.strip()
+            # Parse environment variables in a single regex pass
+            env_vars = {
+                match.group(1).decode(): match.group(2).decode()
+                for match in ENV_ASSIGNMENT_RE.finditer(env_file.read_bytes())
+            }
 
             # Check required variables
             missing_required = []
@@ -270,127 +486,36 @@ class EnvironmentSetup:
 
     def _create_docker_compose(self):
         """Create Docker Compose configuration"""
-        docker_compose = {
-            "version": "3.8",
-            "services": {
-                "monitoring-agent": {
-                    "build": {
-                        "context": ".",
-                        "dockerfile": "Dockerfile.monitoring"
-                    },
-                    "environment": [
-                        "AGENT_NAME=monitoring",
-                        "PYTHONPATH=/workspace"
-                    ],
-                    "volumes": [
-                        "./config:/workspace/config:ro",
-                        "./data:/workspace/data",
-                        "./logs:/workspace/logs"
-                    ],
-                    "restart": "unless-stopped"
-                },
-                "triage-agent": {
-                    "build": {
-                        "context": ".",
-                        "dockerfile": "Dockerfile.triage"
-                    },
-                    "environment": [
-                        "AGENT_NAME=triage",
-                        "PYTHONPATH=/workspace"
-                    ],
-                    "volumes": [
-                        "./config:/workspace/config:ro",
-                        "./data:/workspace/data",
-                        "./logs:/workspace/logs"
-                    ],
-                    "restart": "unless-stopped"
-                },
-                "analysis-agent": {
-                    "build": {
-                        "context": ".",
-                        "dockerfile": "Dockerfile.analysis"
-                    },
-                    "environment": [
-                        "AGENT_NAME=analysis",
-                        "PYTHONPATH=/workspace"
-                    ],
-                    "volumes": [
-                        "./config:/workspace/config:ro",
-                        "./data:/workspace/data",
-                        "./logs:/workspace/logs"
-                    ],
-                    "restart": "unless-stopped"
-                },
-                "notification-agent": {
-                    "build": {
-                        "context": ".",
-                        "dockerfile": "Dockerfile.notification"
-                    },
-                    "environment": [
-                        "AGENT_NAME=notification",
-                        "PYTHONPATH=/workspace"
-                    ],
-                    "volumes": [
-                        "./config:/workspace/config:ro",
-                        "./data:/workspace/data",
-                        "./logs:/workspace/logs"
-                    ],
-                    "restart": "unless-stopped"
-                }
-            },
-            "volumes": {
-                "devops-sentinel-data": {},
-                "devops-sentinel-logs": {}
-            }
-        }
+        services = "".join(DOCKER_COMPOSE_SERVICE_TEMPLATE.format(agent=agent) for agent in AGENT_NAMES)
 
-        docker_compose_file = self.deployment_dir / "docker-compose.yml"
-        with open(docker_compose_file, 'w') as f:
-            yaml.dump(docker_compose, f, default_flow_style=False)
+        docker_compose_file = self._paths["docker_compose"]
+        _write_file(docker_compose_file, DOCKER_COMPOSE_TEMPLATE.format(services=services).encode())
 
         print(f"   ✅ Docker Compose: {docker_compose_file}")
 
     def _create_kubernetes_manifests(self):
         """Create Kubernetes manifests"""
-        k8s_dir = self.deployment_dir / "kubernetes"
+        k8s_dir = self._paths["kubernetes"]
         k8s_dir.mkdir(exist_ok=True)
 
         # Create namespace
-        namespace = {
-            "apiVersion": "v1",
-            "kind": "Namespace",
-            "metadata": {
-                "name": "devops-sentinel"
-            }
-        }
-
         namespace_file = k8s_dir / "namespace.yaml"
-        with open(namespace_file, 'w') as f:
-            yaml.dump(namespace, f)
+        _write_file(namespace_file, K8S_NAMESPACE_MANIFEST.encode())
 
         # Create ConfigMap
-        configmap = {
-            "apiVersion": "v1",
-            "kind": "ConfigMap",
-            "metadata": {
-                "name": "devops-sentinel-config",
-                "namespace": "devops-sentinel"
-            },
-            "data": {
-                "agents.yaml": (self.config_dir / "agents.yaml").read_text(),
-                "endpoints.yaml": (self.config_dir / "endpoints.yaml").read_text()
-            }
-        }
+        configmap = K8S_CONFIGMAP_TEMPLATE.format(
+            agents=_yaml_block(self._read_yaml_text(self._paths["agents"])),
+            endpoints=_yaml_block(self._read_yaml_text(self._paths["endpoints"]))
+        )
 
         configmap_file = k8s_dir / "configmap.yaml"
-        with open(configmap_file, 'w') as f:
-            yaml.dump(configmap, f)
+        _write_file(configmap_file, configmap.encode())
 
         print(f"   ✅ Kubernetes manifests: {k8s_dir}")
 
     def _create_deployment_scripts(self):
         """Create deployment scripts"""
-        scripts_dir = self.deployment_dir / "scripts"
+        scripts_dir = self._paths["scripts"]
         scripts_dir.mkdir(exist_ok=True)
 
         # Create deployment script
@@ -429,11 +554,8 @@ echo "✅ Deployment completed successfully!"
 """
 
         deploy_script_file = scripts_dir / "deploy.sh"
-        with open(deploy_script_file, 'w') as f:
-            f.write(deploy_script)
-
-        # Make script executable
-        os.chmod(deploy_script_file, 0o755)
+        # Write script with executable permissions
+        _write_file(deploy_script_file, deploy_script.encode(), mode=0o755)
 
         # Create status check script
         status_script = """#!/bin/bash
@@ -464,10 +586,7 @@ echo "📊 Status check completed"
 """
 
         status_script_file = scripts_dir / "status.sh"
-        with open(status_script_file, 'w') as f:
-            f.write(status_script)
-
-        os.chmod(status_script_file, 0o755)
+        _write_file(status_script_file, status_script.encode(), mode=0o755)
 
         print(f"   ✅ Deployment scripts: {scripts_dir}")
 
@@ -475,38 +594,39 @@ echo "📊 Status check completed"
         """Validate the complete setup"""
         print("✅ Validating complete setup...")
 
-        # Check required files
-        required_files = [
-            "config/agents.yaml",
-            "config/endpoints.yaml",
-            "deployment/compyle_workflows.yaml",
-            "requirements.txt"
-        ]
+        # List each parent directory once instead of stat-ing every file
+        listings: Dict[str, set] = {}
 
-        for file_path in required_files:
-            full_path = self.project_root / file_path
-            if full_path.exists():
-                print(f"   ✅ {file_path}")
-            else:
-                print(f"   ❌ {file_path} not found")
+        # Check required files
+        for file_path in self.REQUIRED_FILES:
+            self._report_file(file_path, listings)
 
         # Check agent files
-        agent_files = [
-            "agents/monitoring/health_check.py",
-            "agents/triage/data_collector.py",
-            "agents/analysis/llm_analyzer.py",
-            "agents/notification/delivery_service.py"
-        ]
-
-        for file_path in agent_files:
-            full_path = self.project_root / file_path
-            if full_path.exists():
-                print(f"   ✅ {file_path}")
-            else:
-                print(f"   ❌ {file_path} not found")
+        for file_path in self.AGENT_FILES:
+            self._report_file(file_path, listings)
 
         print("🎉 Setup validation completed!")
 
+    def _list_dir(self, relative_dir: str, listings: Dict[str, set]) -> set:
+        """Return entry names of a project directory, listing it at most once"""
+        present = listings.get(relative_dir)
+        if present is None:
+            try:
+                with os.scandir(self.project_root / relative_dir) as entries:
+                    present = {entry.name for entry in entries}
+            except OSError:
+                present = set()
+            listings[relative_dir] = present
+        return present
+
+    def _report_file(self, file_path: str, listings: Dict[str, set]):
+        """Report whether a project file exists using cached directory listings"""
+        parent, _, name = file_path.rpartition("/")
+        if name in self._list_dir(parent, listings):
+            print(f"   ✅ {file_path}")
+        else:
+            print(f"   ❌ {file_path} not found")
+
 def main():
     """Main setup function"""
     setup = EnvironmentSetup()
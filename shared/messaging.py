@@ -5,14 +5,41 @@ Manages communication between specialized monitoring agents
 
 import json
 import time
+import itertools
 import logging
+import threading
+from collections import OrderedDict
+from queue import SimpleQueue, Empty
 from typing import Dict, Any, Optional, Callable
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, field
 from enum import Enum
-from datetime import datetime, timezone
+from datetime import datetime, timedelta
 
 from .utils import TimestampUtils, Logger
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def _encode_default(obj: Any) -> Any:
+    """Fallback serializer: enums by value, anything else as its string form"""
+    if isinstance(obj, Enum):
+        return obj.value
+    return str(obj)
+
+def encode_payload(data: Dict[str, Any]) -> bytes:
+    """Serialize message data to compact JSON bytes"""
+    if orjson is not None:
+        return orjson.dumps(data, default=_encode_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, separators=(',', ':'), default=_encode_default).encode()
+
+def decode_payload(payload: bytes) -> Dict[str, Any]:
+    """Deserialize JSON bytes produced by encode_payload"""
+    if orjson is not None:
+        return orjson.loads(payload)
+    return json.loads(payload)
+
 class MessageType(Enum):
     """Message types for inter-agent communication"""
     HEALTH_CHECK_FAILURE = "health_check_failure"
@@ -24,15 +51,24 @@ class MessageType(Enum):
     NOTIFICATION_SENT = "notification_sent"
     INCIDENT_RESOLVED = "incident_resolved"
 
-@dataclass
+MAX_DELIVERED_MESSAGES = 10_000  # delivered messages kept for lookup, oldest evicted first
+
+# Request type -> type of the reply sent through send_response
+_RESPONSE_MAP: Dict[MessageType, MessageType] = {
+    MessageType.TRIAGE_REQUEST: MessageType.TRIAGE_RESPONSE,
+    MessageType.ANALYSIS_REQUEST: MessageType.ANALYSIS_RESPONSE,
+    MessageType.NOTIFICATION_REQUEST: MessageType.NOTIFICATION_SENT
+}
+
+@dataclass(slots=True, frozen=True)
 class Message:
-    """Message structure for inter-agent communication"""
+    """Message structure for inter-agent communication; immutable and hashable by its envelope"""
     id: str
     type: MessageType
     sender: str
     recipient: str
     timestamp: datetime
-    data: Dict[str, Any]
+    data: Dict[str, Any] = field(hash=False)  # dicts are unhashable; still compared by ==
     correlation_id: Optional[str] = None
     requires_response: bool = False
     response_timeout: int = 300  # 5 minutes default
@@ -42,30 +78,58 @@ class MessageQueue:
 
     def __init__(self):
         self.logger = Logger.setup_logger("MessageQueue")
-        self.queues: Dict[str, list] = {}  # agent_name -> message queue
+        self.queues: Dict[str, SimpleQueue] = {}  # agent_name -> message queue
         self.message_handlers: Dict[str, Callable] = {}  # message_type -> handler
-        self.delivered_messages: Dict[str, Message] = {}  # message_id -> message
-        self.pending_responses: Dict[str, Message] = {}  # correlation_id -> original message
+        self.delivered_messages: OrderedDict[str, Message] = OrderedDict()  # message_id -> message
+        self.pending_responses: OrderedDict[str, Message] = OrderedDict()  # correlation_id -> original message
+        self.wakeup_callbacks: Dict[str, Callable[[], None]] = {}  # agent_name -> new-message callback
+        self._response_events: Dict[str, threading.Event] = {}  # correlation_id -> response signal
+        self._responses: Dict[str, Message] = {}  # correlation_id -> response message
+        self._waiting: set = set()  # correlation_ids with a wait_for_response in progress
+        self._id_counter = itertools.count()
+        self._id_prefix = ("", 0.0)  # (formatted second, epoch it was formatted at)
+
+    def register_wakeup(self, agent_name: str, callback: Callable[[], None]):
+        """Register a callback invoked whenever a message is queued for an agent"""
+        self.wakeup_callbacks[agent_name] = callback
+
+    def unregister_wakeup(self, agent_name: str):
+        """Remove an agent's new-message callback"""
+        self.wakeup_callbacks.pop(agent_name, None)
 
     def register_handler(self, agent_name: str, handler: Callable):
         """Register message handler for an agent"""
         self.message_handlers[agent_name] = handler
         if agent_name not in self.queues:
-            self.queues[agent_name] = []
+            self.queues[agent_name] = SimpleQueue()
         self.logger.info(f"Registered handler for agent: {agent_name}")
 
     def send_message(self, message: Message) -> bool:
         """Send message to specified agent"""
         try:
             # Store message in delivery queue
-            if message.recipient not in self.queues:
-                self.queues[message.recipient] = []
+            queue = self.queues.get(message.recipient)
+            if queue is None:
+                queue = self.queues.setdefault(message.recipient, SimpleQueue())
 
-            self.queues[message.recipient].append(message)
+            queue.put(message)
             self.delivered_messages[message.id] = message
+            if len(self.delivered_messages) > MAX_DELIVERED_MESSAGES:
+                self.delivered_messages.popitem(last=False)
 
             if message.requires_response:
+                self._sweep_pending_responses()
                 self.pending_responses[message.correlation_id] = message
+                self._response_events[message.correlation_id] = threading.Event()
+
+            # The message is already queued, so a failed wakeup (e.g. the
+            # recipient's loop has closed) must not report the send as failed
+            wakeup = self.wakeup_callbacks.get(message.recipient)
+            if wakeup:
+                try:
+                    wakeup()
+                except Exception as e:
+                    self.logger.warning(f"Wakeup for {message.recipient} failed: {e}")
 
             self.logger.info(f"Message sent: {message.type.value} from {message.sender} to {message.recipient}")
             return True
@@ -74,13 +138,31 @@ class MessageQueue:
             self.logger.error(f"Failed to send message: {e}")
             return False
 
-    def receive_messages(self, agent_name: str) -> list:
-        """Receive all messages for an agent"""
-        if agent_name not in self.queues:
+    def _sweep_pending_responses(self):
+        """Drop pending responses whose timeout has passed, oldest first; active waiters clean up their own"""
+        now = TimestampUtils.now_utc()
+        for correlation_id, message in list(self.pending_responses.items()):
+            if message.timestamp + timedelta(seconds=message.response_timeout) > now:
+                break
+            if correlation_id in self._waiting:
+                continue
+            del self.pending_responses[correlation_id]
+            self._response_events.pop(correlation_id, None)
+            self._responses.pop(correlation_id, None)
+
+    def receive_messages(self, agent_name: str, max_batch: Optional[int] = None) -> list:
+        """Receive pending messages for an agent, at most max_batch when given"""
+        queue = self.queues.get(agent_name)
+        if queue is None:
             return []
 
-        messages = self.queues[agent_name].copy()
-        self.queues[agent_name].clear()
+        messages = []
+        get_nowait = queue.get_nowait
+        while max_batch is None or len(messages) < max_batch:
+            try:
+                messages.append(get_nowait())
+            except Empty:
+                break
         return messages
 
     def send_response(self, original_message: Message, response_data: Dict[str, Any]) -> bool:
@@ -88,9 +170,13 @@ class MessageQueue:
         if not original_message.correlation_id:
             return False
 
+        response_type = _RESPONSE_MAP.get(original_message.type)
+        if response_type is None:
+            return False
+
         response_message = Message(
             id=self._generate_message_id(),
-            type=MessageType(f"{original_message.type.value}_response"),
+            type=response_type,
             sender=original_message.recipient,
             recipient=original_message.sender,
             timestamp=TimestampUtils.now_utc(),
@@ -98,26 +184,36 @@ class MessageQueue:
             correlation_id=original_message.correlation_id
         )
 
-        return self.send_message(response_message)
+        if not self.send_message(response_message):
+            return False
+
+        # Only keep the response for a sender that registered to wait for it;
+        # wait_for_response takes it out again
+        event = self._response_events.get(original_message.correlation_id)
+        if event is not None:
+            self._responses[original_message.correlation_id] = response_message
+            event.set()
+        return True
 
     def wait_for_response(self, correlation_id: str, timeout: int = 300) -> Optional[Message]:
         """Wait for response to a message"""
-        start_time = time.time()
-
-        while time.time() - start_time < timeout:
-            # Check if response received (implementation would check queues)
-            time.sleep(1)
-
-        # Timeout occurred
-        if correlation_id in self.pending_responses:
-            del self.pending_responses[correlation_id]
-
-        return None
+        event = self._response_events.get(correlation_id)
+        self._waiting.add(correlation_id)
+        try:
+            if event:
+                event.wait(timeout)
+            return self._responses.pop(correlation_id, None)
+        finally:
+            self._waiting.discard(correlation_id)
+            self._response_events.pop(correlation_id, None)
+            self.pending_responses.pop(correlation_id, None)
 
     def _generate_message_id(self) -> str:
         """Generate unique message ID"""
-        timestamp = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S_%f")
-        return f"MSG_{timestamp}"
+        now = time.time()
+        if now - self._id_prefix[1] >= 1.0:
+            self._id_prefix = (time.strftime("%Y%m%d_%H%M%S", time.gmtime(now)), now)
+        return f"MSG_{self._id_prefix[0]}_{next(self._id_counter)}"
 
 class AgentCommunication:
     """High-level communication interface for agents"""
@@ -134,7 +230,7 @@ class AgentCommunication:
             type=MessageType.TRIAGE_REQUEST,
             sender=self.agent_name,
             recipient="triage",
-            timestamp=TimestampUtils.now_utc(),
+            timestamp=TimestampUtils.now_utc_cached(),
             data={
                 "incident_id": incident_id,
                 "endpoint_name": endpoint_name,
@@ -155,7 +251,7 @@ class AgentCommunication:
             type=MessageType.ANALYSIS_REQUEST,
             sender=self.agent_name,
             recipient="analysis",
-            timestamp=TimestampUtils.now_utc(),
+            timestamp=TimestampUtils.now_utc_cached(),
             data={
                 "incident_id": incident_id,
                 "health_check": health_check,
@@ -176,7 +272,7 @@ class AgentCommunication:
             type=MessageType.NOTIFICATION_REQUEST,
             sender=self.agent_name,
             recipient="notification",
-            timestamp=TimestampUtils.now_utc(),
+            timestamp=TimestampUtils.now_utc_cached(),
             data={"incident": incident},
             requires_response=True,
             correlation_id=f"notification_{incident['id']}"
@@ -193,7 +289,7 @@ class AgentCommunication:
             type=MessageType.HEALTH_CHECK_FAILURE,
             sender=self.agent_name,
             recipient="monitoring",
-            timestamp=TimestampUtils.now_utc(),
+            timestamp=TimestampUtils.now_utc_cached(),
             data=incident
         )
 
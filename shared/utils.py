@@ -3,15 +3,84 @@ DevOps Sentinel - Shared Utilities
 Common utilities used across all agents
 """
 
+import os
+import re
+import copy
+import hashlib
 import json
 import time
 import logging
-import yaml
 from datetime import datetime, timezone, timedelta
-from typing import Dict, List, Any, Optional
-from dataclasses import dataclass, asdict
+from collections import OrderedDict
+from typing import Dict, List, Any, Optional, Tuple
+from dataclasses import dataclass, field
+from functools import lru_cache
 from enum import Enum
 
+@lru_cache(maxsize=None)
+def _get_yaml_loader() -> Tuple[Any, type]:
+    """Import PyYAML on first use and pick the libyaml loader when available"""
+    import yaml
+    try:
+        from yaml import CSafeLoader as Loader
+    except ImportError:
+        from yaml import SafeLoader as Loader
+    return yaml, Loader
+
+_YAML_CACHE_SIZE = 64
+_YAML_CACHE: "OrderedDict[str, Tuple[float, int, Any]]" = OrderedDict()  # path -> (mtime, size, parsed)
+
+def _yaml_sidecar_dir() -> str:
+    """Directory for JSON sidecars of parsed YAML, kept out of the (possibly read-only) config dir"""
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(cache_home, "devops-sentinel", "yaml")
+
+def _load_yaml_with_sidecar(path: str, st: os.stat_result) -> Any:
+    """Parse a YAML file via its JSON sidecar when that matches the file's mtime and size"""
+    key = hashlib.sha1(os.path.abspath(path).encode()).hexdigest()
+    sidecar = os.path.join(_yaml_sidecar_dir(), f"{key}.json")
+    try:
+        with open(sidecar, 'rb') as f:
+            cached = json.load(f)
+        if cached["mtime_ns"] == st.st_mtime_ns and cached["size"] == st.st_size:
+            return cached["data"]
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+
+    yaml, loader = _get_yaml_loader()
+    with open(path, 'r') as f:
+        data = yaml.load(f, Loader=loader)
+
+    # Only keep a sidecar that round-trips exactly; an unwritable cache dir just skips it
+    try:
+        text = json.dumps({"mtime_ns": st.st_mtime_ns, "size": st.st_size, "data": data})
+        if json.loads(text)["data"] == data:
+            os.makedirs(os.path.dirname(sidecar), exist_ok=True)
+            tmp_path = f"{sidecar}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w') as f:
+                f.write(text)
+            os.replace(tmp_path, sidecar)
+    except (OSError, TypeError, ValueError):
+        pass
+
+    return data
+
+def _load_yaml_cached(path: str) -> Any:
+    """Parse a YAML file, reusing the last parse while its mtime and size are unchanged"""
+    st = os.stat(path)
+    cached = _YAML_CACHE.get(path)
+    if cached is not None and cached[0] == st.st_mtime and cached[1] == st.st_size:
+        _YAML_CACHE.move_to_end(path)
+        return copy.deepcopy(cached[2])
+
+    data = _load_yaml_with_sidecar(path, st)
+
+    _YAML_CACHE[path] = (st.st_mtime, st.st_size, data)
+    _YAML_CACHE.move_to_end(path)
+    if len(_YAML_CACHE) > _YAML_CACHE_SIZE:
+        _YAML_CACHE.popitem(last=False)
+    return copy.deepcopy(data)
+
 class IncidentStatus(Enum):
     """Incident status enumeration"""
     DETECTED = "detected"
@@ -26,7 +95,7 @@ class AlertLevel(Enum):
     HIGH = "high"
     CRITICAL = "critical"
 
-@dataclass
+@dataclass(slots=True)
 class HealthCheckResult:
     """Health check result data structure"""
     endpoint_name: str
@@ -38,7 +107,20 @@ class HealthCheckResult:
     error_message: Optional[str] = None
     ssl_expiry_days: Optional[int] = None
 
-@dataclass
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize to a plain dict without the deep copy done by asdict"""
+        return {
+            "endpoint_name": self.endpoint_name,
+            "url": self.url,
+            "status_code": self.status_code,
+            "response_time": self.response_time,
+            "timestamp": self.timestamp.isoformat(),
+            "success": self.success,
+            "error_message": self.error_message,
+            "ssl_expiry_days": self.ssl_expiry_days
+        }
+
+@dataclass(slots=True)
 class Incident:
     """Incident data structure"""
     id: str
@@ -51,11 +133,36 @@ class Incident:
     triage_data: Optional[Dict[str, Any]] = None
     analysis_result: Optional[Dict[str, Any]] = None
     notifications_sent: List[Dict[str, Any]] = None
+    # (health check result, its dict form), rebuilt when health_check_result is reassigned
+    _hc_dict_cache: Optional[Tuple[HealthCheckResult, Dict[str, Any]]] = field(default=None, init=False, repr=False, compare=False)
 
     def __post_init__(self):
         if self.notifications_sent is None:
             self.notifications_sent = []
 
+    def health_check_dict(self) -> Dict[str, Any]:
+        """Dict form of health_check_result, serialized once per attached result"""
+        cache = self._hc_dict_cache
+        if cache is None or cache[0] is not self.health_check_result:
+            cache = (self.health_check_result, self.health_check_result.to_dict())
+            self._hc_dict_cache = cache
+        return dict(cache[1])
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize to a plain dict without the deep copy done by asdict"""
+        return {
+            "id": self.id,
+            "endpoint_name": self.endpoint_name,
+            "status": self.status.value,
+            "alert_level": self.alert_level.value,
+            "timestamp": self.timestamp.isoformat(),
+            "last_updated": self.last_updated.isoformat(),
+            "health_check_result": self.health_check_dict(),
+            "triage_data": self.triage_data,
+            "analysis_result": self.analysis_result,
+            "notifications_sent": list(self.notifications_sent)
+        }
+
 class ConfigManager:
     """Configuration management for agents"""
 
@@ -67,8 +174,7 @@ class ConfigManager:
     def _load_endpoints(self) -> List[Dict[str, Any]]:
         """Load endpoint configurations"""
         try:
-            with open(f"{self.config_dir}/endpoints.yaml", 'r') as f:
-                return yaml.safe_load(f)['endpoints']
+            return _load_yaml_cached(f"{self.config_dir}/endpoints.yaml")['endpoints']
         except Exception as e:
             logging.error(f"Failed to load endpoints config: {e}")
             return []
@@ -76,8 +182,7 @@ class ConfigManager:
     def _load_agents_config(self) -> Dict[str, Any]:
         """Load agent configurations"""
         try:
-            with open(f"{self.config_dir}/agents.yaml", 'r') as f:
-                return yaml.safe_load(f)
+            return _load_yaml_cached(f"{self.config_dir}/agents.yaml")
         except Exception as e:
             logging.error(f"Failed to load agents config: {e}")
             return {}
@@ -90,6 +195,24 @@ class ConfigManager:
         """Get configuration for specific agent"""
         return self.agents_config.get('agents', {}).get(agent_name, {})
 
+@lru_cache(maxsize=8)
+def get_config_manager(config_dir: str = "config") -> ConfigManager:
+    """Get the process-wide ConfigManager for a config directory"""
+    return ConfigManager(config_dir)
+
+_LEVEL_MAP = {
+    "NOTSET": logging.NOTSET,
+    "DEBUG": logging.DEBUG,
+    "INFO": logging.INFO,
+    "WARN": logging.WARNING,
+    "WARNING": logging.WARNING,
+    "ERROR": logging.ERROR,
+    "FATAL": logging.CRITICAL,
+    "CRITICAL": logging.CRITICAL
+}
+
+_FORMATTER = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
 class Logger:
     """Standardized logging for all agents"""
 
@@ -100,23 +223,36 @@ class Logger:
 
         if not logger.handlers:
             handler = logging.StreamHandler()
-            formatter = logging.Formatter(
-                '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-            )
-            handler.setFormatter(formatter)
+            handler.setFormatter(_FORMATTER)
             logger.addHandler(handler)
 
-        logger.setLevel(getattr(logging, level.upper()))
+        numeric_level = _LEVEL_MAP.get(level.upper())
+        if numeric_level is None:
+            raise ValueError(f"Unknown log level: {level}")
+        logger.setLevel(numeric_level)
         return logger
 
 class TimestampUtils:
     """Utilities for timestamp handling"""
 
+    _cached_now = (0.0, None)  # (epoch seconds, datetime) of the last cached read
+
     @staticmethod
     def now_utc() -> datetime:
         """Get current UTC time"""
         return datetime.now(timezone.utc)
 
+    @staticmethod
+    def now_utc_cached() -> datetime:
+        """Get current UTC time, reusing the value for up to a millisecond"""
+        now = time.time()
+        cached_at, cached = TimestampUtils._cached_now
+        if cached is not None and 0 <= now - cached_at < 0.001:
+            return cached
+        cached = datetime.fromtimestamp(now, timezone.utc)
+        TimestampUtils._cached_now = (now, cached)
+        return cached
+
     @staticmethod
     def format_timestamp(dt: datetime) -> str:
         """Format datetime for consistent display"""
@@ -125,33 +261,34 @@ class TimestampUtils:
     @staticmethod
     def minutes_ago(minutes: int) -> datetime:
         """Get timestamp N minutes ago"""
-        return TimestampUtils.now_utc() - timedelta(minutes=minutes)
+        return datetime.now(timezone.utc) - timedelta(minutes=minutes)
 
 class IncidentIDGenerator:
     """Generate unique incident IDs"""
 
     @staticmethod
-    def generate() -> str:
+    def generate(now: Optional[datetime] = None) -> str:
         """Generate unique incident ID with timestamp"""
-        timestamp = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S")
-        return f"INC_{timestamp}"
+        n = now or datetime.now(timezone.utc)
+        return f"INC_{n.year:04d}{n.month:02d}{n.day:02d}_{n.hour:02d}{n.minute:02d}{n.second:02d}"
 
 class NetworkUtils:
     """Network-related utilities"""
 
+    SSL_ERROR_RE = re.compile(r"ssl|certificate|tls|handshake", re.IGNORECASE)
+    TIMEOUT_ERROR_RE = re.compile(r"timeout|timed out|connection refused", re.IGNORECASE)
+
     @staticmethod
     def is_ssl_error(error: Exception) -> bool:
         """Check if error is SSL-related"""
-        ssl_error_keywords = ['ssl', 'certificate', 'tls', 'handshake']
-        error_str = str(error).lower()
-        return any(keyword in error_str for keyword in ssl_error_keywords)
+        return NetworkUtils.SSL_ERROR_RE.search(str(error)) is not None
 
     @staticmethod
     def is_timeout_error(error: Exception) -> bool:
         """Check if error is timeout-related"""
-        timeout_error_keywords = ['timeout', 'timed out', 'connection refused']
-        error_str = str(error).lower()
-        return any(keyword in error_str for keyword in timeout_error_keywords)
+        return NetworkUtils.TIMEOUT_ERROR_RE.search(str(error)) is not None
+
+_now_utc = TimestampUtils.now_utc
 
 class MessageFormatter:
     """Format messages for inter-agent communication"""
@@ -164,8 +301,8 @@ class MessageFormatter:
             "incident_id": incident.id,
             "endpoint_name": incident.endpoint_name,
             "alert_level": incident.alert_level.value,
-            "timestamp": TimestampUtils.format_timestamp(incident.timestamp),
-            "health_check": asdict(incident.health_check_result)
+            "timestamp": incident.timestamp.isoformat(),
+            "health_check": incident.health_check_dict()
         }
 
     @staticmethod
@@ -176,7 +313,7 @@ class MessageFormatter:
             "incident_id": incident.id,
             "endpoint_name": incident.endpoint_name,
             "url": incident.health_check_result.url,
-            "timestamp": TimestampUtils.format_timestamp(incident.timestamp)
+            "timestamp": incident.timestamp.isoformat()
         }
 
     @staticmethod
@@ -185,16 +322,16 @@ class MessageFormatter:
         return {
             "type": "analysis_request",
             "incident_id": incident.id,
-            "health_check": asdict(incident.health_check_result),
+            "health_check": incident.health_check_dict(),
             "triage_data": incident.triage_data,
-            "timestamp": TimestampUtils.format_timestamp(incident.timestamp)
+            "timestamp": incident.timestamp.isoformat()
         }
 
     @staticmethod
-    def format_notification_request(incident: Incident) -> Dict[str, Any]:
+    def format_notification_request(incident: Incident, now: Optional[datetime] = None) -> Dict[str, Any]:
         """Format notification request"""
         return {
             "type": "notification_request",
-            "incident": asdict(incident),
-            "timestamp": TimestampUtils.format_timestamp(TimestampUtils.now_utc())
-        }
\ No newline at end of file
+            "incident": incident.to_dict(),
+            "timestamp": (now or _now_utc()).isoformat()
+        }
@@ -6,13 +6,75 @@ Validates the implementation without external dependencies
 
 import sys
 import os
+import re
+import mmap
+import io
+import functools
+from contextlib import redirect_stdout
 from pathlib import Path
 from datetime import datetime, timezone, timedelta
 
-# Add project root to Python path
+# Only file contents are checked, so the project never needs to be importable
 project_root = Path(__file__).parent.parent
-sys.path.insert(0, str(project_root))
 
+ENDPOINT_LINE_RE = re.compile(r"^[ \t]*- name:", re.MULTILINE)
+AGENT_SECTION_RE = re.compile(r"(monitoring|triage|analysis|notification):")
+AGENT_WORKFLOW_RE = re.compile(r"(monitoring|triage|analysis|notification)-agent:")
+AGENT_ROLES = ("monitoring", "triage", "analysis", "notification")
+
+README_SECTIONS = [
+    "# DevOps Sentinel",
+    "## 🎯 Overview",
+    "## 🤖 Agent Architecture",
+    "## 🚀 Quick Start",
+    "## 📊 Monitoring Configuration",
+    "## 🔔 Notification Channels",
+    "## 🛠️ Development"
+]
+README_SECTION_BYTES = [section.encode() for section in README_SECTIONS]
+UTF8_CONTINUATION_RE = re.compile(rb"[\x80-\xbf]+")
+
+# Per-file structure output is only printed with --verbose
+VERBOSE = "--verbose" in sys.argv
+
+# Directory listings taken once per run: relative dir -> entry names (None if missing)
+_dir_listings = {}
+
+def _dir_entries(directory):
+    """List a project directory once, returning None if it does not exist"""
+    directory = directory.rstrip("/")
+    if directory not in _dir_listings:
+        try:
+            with os.scandir(project_root / directory) as entries:
+                _dir_listings[directory] = {entry.name for entry in entries}
+        except OSError:
+            _dir_listings[directory] = None
+    return _dir_listings[directory]
+
+@functools.lru_cache(maxsize=64)
+def _read_text(path):
+    """Read a file once per run"""
+    return Path(path).read_text()
+
+def _buffered_output(func):
+    """Collect a validator's printed report and write it to stdout in one call"""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        buffer = io.StringIO()
+        try:
+            with redirect_stdout(buffer):
+                return func(*args, **kwargs)
+        finally:
+            sys.stdout.write(buffer.getvalue())
+    return wrapper
+
+def _project_file_exists(relative_path):
+    """Check a project path against its parent's cached listing"""
+    parent, _, name = relative_path.rstrip("/").rpartition("/")
+    entries = _dir_entries(parent)
+    return entries is not None and name in entries
+
+@_buffered_output
 def validate_project_structure():
     """Validate the project structure is complete"""
     print("🏗️  Validating Project Structure")
@@ -30,27 +92,33 @@ def validate_project_structure():
         "tests/": ["test_workflow.py", "basic_validation.py"]
     }
 
-    missing_files = []
-    total_files = 0
-    found_files = 0
-
-    for directory, files in required_structure.items():
-        dir_path = project_root / directory
-        print(f"\n📁 {directory}")
-
-        if dir_path.exists():
+    # Diff expected paths against one listing per directory
+    expected = frozenset(
+        f"{directory}{name}".rstrip("/")
+        for directory, files in required_structure.items()
+        for name in files
+    )
+    actual = {
+        f"{directory}{entry}"
+        for directory in required_structure
+        for entry in (_dir_entries(directory) or ())
+    }
+    missing_files = sorted(expected - actual)
+    total_files = len(expected)
+    found_files = total_files - len(missing_files)
+
+    if VERBOSE:
+        for directory, files in required_structure.items():
+            print(f"\n📁 {directory}")
+            if _dir_entries(directory) is None:
+                print(f"   ❌ Directory not found: {directory}")
+                continue
             for file_name in files:
-                total_files += 1
-                file_path = dir_path / file_name
-                if file_path.exists():
-                    print(f"   ✅ {file_name}")
-                    found_files += 1
-                else:
-                    print(f"   ❌ {file_name}")
-                    missing_files.append(str(file_path))
-        else:
-            print(f"   ❌ Directory not found: {directory}")
-            missing_files.append(directory)
+                marker = "✅" if f"{directory}{file_name}".rstrip("/") in actual else "❌"
+                print(f"   {marker} {file_name}")
+    else:
+        for path in missing_files:
+            print(f"   ❌ {path}")
 
     print(f"\n📊 Structure Summary:")
     print(f"   Total files expected: {total_files}")
@@ -60,6 +128,7 @@ def validate_project_structure():
 
     return len(missing_files) == 0
 
+@_buffered_output
 def validate_configuration_files():
     """Validate configuration files have correct structure"""
     print("\n⚙️  Validating Configuration Files")
@@ -68,14 +137,13 @@ def validate_configuration_files():
     # Check endpoints configuration
     endpoints_file = project_root / "config" / "endpoints.yaml"
     print(f"\n📋 endpoints.yaml:")
-    if endpoints_file.exists():
-        content = endpoints_file.read_text()
+    if _project_file_exists("config/endpoints.yaml"):
+        content = _read_text(str(endpoints_file))
         if "endpoints:" in content and len(content) > 100:
             print("   ✅ Valid endpoints configuration found")
             # Count endpoints
-            lines = content.split('\n')
-            endpoint_lines = [line for line in lines if line.strip().startswith('- name:')]
-            print(f"   📊 Found {len(endpoint_lines)} configured endpoints")
+            endpoint_count = len(ENDPOINT_LINE_RE.findall(content))
+            print(f"   📊 Found {endpoint_count} configured endpoints")
         else:
             print("   ❌ Invalid endpoints configuration")
     else:
@@ -84,19 +152,15 @@ def validate_configuration_files():
     # Check agents configuratio
     agents_file = project_root / "config" / "agents.yaml"
     print(f"\n🤖 agents.yaml:")
-    if agents_file.exists():
-        content = agents_file.read_text()
+    if _project_file_exists("config/agents.yaml"):
+        content = _read_text(str(agents_file))
         if "agents:" in content and len(content) > 100:
             print("   ✅ Valid agents configuration found")
             # Count agents
-            if "monitoring:" in content:
-                print("   ✅ Monitoring agent configuration found")
-            if "triage:" in content:
-                print("   ✅ Triage agent configuration found")
-            if "analysis:" in content:
-                print("   ✅ Analysis agent configuration found")
-            if "notification:" in content:
-                print("   ✅ Notification agent configuration found")
+            sections = set(AGENT_SECTION_RE.findall(content))
+            for role in AGENT_ROLES:
+                if role in sections:
+                    print(f"   ✅ {role.capitalize()} agent configuration found")
         else:
             print("   ❌ Invalid agents configuration")
     else:
@@ -105,24 +169,21 @@ def validate_configuration_files():
     # Check Compyle workflows
     workflows_file = project_root / "deployment" / "compyle_workflows.yaml"
     print(f"\n🚀 compyle_workflows.yaml:")
-    if workflows_file.exists():
-        content = workflows_file.read_text()
+    if _project_file_exists("deployment/compyle_workflows.yaml"):
+        content = _read_text(str(workflows_file))
         if "workflows:" in content and len(content) > 200:
             print("   ✅ Valid Compyle workflows configuration found")
             # Check for key agents
-            if "monitoring-agent:" in content:
-                print("   ✅ Monitoring agent workflow defined")
-            if "triage-agent:" in content:
-                print("   ✅ Triage agent workflow defined")
-            if "analysis-agent:" in content:
-                print("   ✅ Analysis agent workflow defined")
-            if "notification-agent:" in content:
-                print("   ✅ Notification agent workflow defined")
+            workflows = set(AGENT_WORKFLOW_RE.findall(content))
+            for role in AGENT_ROLES:
+                if role in workflows:
+                    print(f"   ✅ {role.capitalize()} agent workflow defined")
         else:
             print("   ❌ Invalid Compyle workflows configuration")
     else:
         print("   ❌ compyle_workflows.yaml not found")
 
+@_buffered_output
 def validate_agent_implementations():
     """Validate agent implementation files"""
     print("\n🤖 Validating Agent Implementations")
@@ -157,8 +218,8 @@ def validate_agent_implementations():
         print(f"\n🔧 {agent_name}:")
         agent_file = project_root / file_path
 
-        if agent_file.exists():
-            content = agent_file.read_text()
+        if _project_file_exists(file_path):
+            content = _read_text(str(agent_file))
             found_items = 0
 
             for required_item in required_classes:
@@ -181,6 +242,7 @@ def validate_agent_implementations():
         else:
             print(f"   ❌ File not found: {file_path}")
 
+@_buffered_output
 def validate_shared_components():
     """Validate shared utility components"""
     print("\n🔗 Validating Shared Components")
@@ -190,7 +252,7 @@ def validate_shared_components():
     utils_file = project_root / "shared" / "utils.py"
     print(f"\n🛠️  utils.py:")
     if utils_file.exists():
-        content = utils_file.read_text()
+        content = _read_text(str(utils_file))
 
         required_components = [
             "class IncidentStatus",
@@ -219,7 +281,7 @@ def validate_shared_components():
     messaging_file = project_root / "shared" / "messaging.py"
     print(f"\n📨 messaging.py:")
     if messaging_file.exists():
-        content = messaging_file.read_text()
+        content = _read_text(str(messaging_file))
 
         required_components = [
             "class Message",
@@ -240,6 +302,7 @@ def validate_shared_components():
     else:
         print("   ❌ messaging.py not found")
 
+@_buffered_output
 def validate_documentation():
     """Validate documentation quality"""
     print("\n📚 Validating Documentation")
@@ -247,29 +310,31 @@ def validate_documentation():
 
     readme_file = project_root / "README.md"
     if readme_file.exists():
-        content = readme_file.read_text()
+        # Scan the raw bytes in place; no need to decode the whole README
+        with open(readme_file, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:  # mmap rejects empty files
+                present = [False] * len(README_SECTION_BYTES)
+                doc_length = 0
+            else:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    present = [mm.find(marker) != -1 for marker in README_SECTION_BYTES]
+                    # Characters are the UTF-8 bytes that are not continuation bytes
+                    doc_length = len(mm) - sum(
+                        match.end() - match.start() for match in UTF8_CONTINUATION_RE.finditer(mm)
+                    )
 
         # Check for key documentation sections
-        required_sections = [
-            "# DevOps Sentinel",
-            "## 🎯 Overview",
-            "## 🤖 Agent Architecture",
-            "## 🚀 Quick Start",
-            "## 📊 Monitoring Configuration",
-            "## 🔔 Notification Channels",
-            "## 🛠️ Development"
-        ]
+        required_sections = README_SECTIONS
 
         found_sections = 0
-        for section in required_sections:
-            if section in content:
+        for section, is_present in zip(required_sections, present):
+            if is_present:
                 print(f"   ✅ {section}")
                 found_sections += 1
             else:
                 print(f"   ❌ {section}")
 
         # Check documentation quality metrics
-        doc_length = len(content)
         print(f"   📊 Documentation length: {doc_length:,} characters")
         print(f"   📊 Sections coverage: {(found_sections/len(required_sections))*100:.1f}%")
 
@@ -282,6 +347,7 @@ def validate_documentation():
     else:
         print("   ❌ README.md not found")
 
+@_buffered_output
 def validate_workflow_completeness():
     """Validate the complete workflow implementation"""
     print("\n🔄 Validating Workflow Completeness")
@@ -321,7 +387,7 @@ def validate_workflow_completeness():
     # Check messaging system
     messaging_file = project_root / "shared" / "messaging.py"
     if messaging_file.exists():
-        content = messaging_file.read_text()
+        content = _read_text(str(messaging_file))
         if "MessageQueue" in content and "AgentCommunication" in content:
             print("   ✅ Inter-agent messaging system available")
 
@@ -5,7 +5,9 @@ Tests the complete monitoring workflow from incident detection to notification
 """
 
 import asyncio
+import functools
 import json
+import logging
 import sys
 import os
 from pathlib import Path
@@ -13,102 +15,275 @@ from datetime import datetime, timezone, timedelta
 from typing import Dict, List, Any
 import unittest.mock as mock
 
-# Add project root to Python path
+# Add project root to Python path; the tests run as scripts (sys.path[0] is
+# tests/) and the repo has no packaging config that would put it there
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
 from shared.utils import (
-    ConfigManager, Logger, HealthCheckResult, Incident,
+    ConfigManager, get_config_manager, Logger, HealthCheckResult, Incident,
     IncidentStatus, AlertLevel, IncidentIDGenerator, TimestampUtils
 )
-from shared.messaging import MessageQueue, create_agent_communication, Message, MessageType
+from shared.messaging import (
+    MessageQueue, create_agent_communication, Message, MessageType, encode_payload, decode_payload
+)
+
+@functools.cache
+def _health_checker_cls():
+    """Import HealthChecker on first use so only its test pays for aiohttp"""
+    from agents.monitoring.health_check import HealthChecker
+    return HealthChecker
+
+@functools.cache
+def _alert_formatter_cls():
+    """Import AlertFormatter on first use so only its test loads the notification agent"""
+    from agents.notification.alert_formatter import AlertFormatter
+    return AlertFormatter
+
+# Set DEVOPS_SENTINEL_LIVE=1 to hit real endpoints instead of mocked HTTP responses
+LIVE_NETWORK = os.getenv("DEVOPS_SENTINEL_LIVE") == "1"
+LIVE_CONCURRENCY = 5
+
+_MOCK_HTTP_RESPONSE = {"status_code": 200, "headers": {}, "content_length": "0"}
+
+# Keys each structure under test must carry, checked with one set difference
+_REQUIRED_AGENT_CONFIG = {
+    "monitoring": {"poll_interval"},
+    "triage": {"log_window_minutes"},
+    "analysis": {"llm_model"},
+    "notification": {"cooldown_period"}
+}
+_REQUIRED_TRIAGE_KEYS = {"incident_id", "data_collection", "summary"}
+_REQUIRED_DATA_SOURCES = {"logs", "network_diagnostics", "system_metrics"}
+_REQUIRED_SUMMARY_KEYS = {"key_findings", "recommendations"}
+_REQUIRED_ANALYSIS_KEYS = {"hypotheses", "primary_hypothesis", "confidence_level", "recommendations"}
+_REQUIRED_SLACK_ATTACHMENT_KEYS = {"title", "fields"}
+_REQUIRED_EMAIL_KEYS = {"subject", "html_body", "text_body"}
+
+# Mock payloads are built once; tests merge in their timestamps with |
+_MOCK_TRIAGE_DATA = {
+    "incident_id": "INC_TEST_001",
+    "endpoint_name": "Test Service",
+    "data_collection": {
+        "logs": {
+            "service_name": "Test Service",
+            "logs": [
+                {"timestamp": "2024-01-15T14:30:00Z", "level": "ERROR", "message": "Database connection failed"},
+                {"timestamp": "2024-01-15T14:31:00Z", "level": "WARN", "message": "Retry attempt 1"}
+            ],
+            "error_count": 1,
+            "warning_count": 1
+        },
+        "network_diagnostics": {
+            "tests": {
+                "ping": {"status": "success", "average_time_ms": 15.2},
+                "dns_resolution": {"status": "success", "resolution_time_ms": 5.1},
+                "port_connectivity": {"status": "failed", "error": "Connection refused"}
+            }
+        },
+        "system_metrics": {
+            "system_metrics": {
+                "cpu_usage_percent": 45.2,
+                "memory_usage_percent": 67.8,
+                "disk_usage_percent": 23.1
+            }
+        }
+    },
+    "summary": {
+        "data_sources_successful": ["logs", "network_diagnostics", "system_metrics"],
+        "key_findings": ["Found 1 errors in recent logs", "Network port connectivity failed"],
+        "recommendations": ["Check service availability", "Verify network configuration"]
+    }
+}
+
+_MOCK_HEALTH_CHECK = {
+    "endpoint_name": "Test Service",
+    "url": "https://example.com/health",
+    "status_code": 503,
+    "response_time": 5000.0,
+    "success": False,
+    "error_message": "Service Unavailable"
+}
+
+_MOCK_ANALYSIS_TRIAGE_DATA = {
+    "data_collection": {
+        "logs": {
+            "error_count": 5,
+            "error_patterns": [{"pattern": "database connection", "count": 3}]
+        },
+        "network_diagnostics": {
+            "tests": {
+                "port_connectivity": {"status": "failed"}
+            }
+        }
+    }
+}
+
+_MOCK_ANALYSIS_RESULT = {
+    "incident_id": "INC_TEST_001",
+    "hypotheses": [
+        {
+            "id": "hypothesis_001",
+            "description": "Database connectivity issue detected",
+            "confidence": 0.85,
+            "evidence": ["Database connection errors in logs", "Port connectivity failed"],
+            "recommended_actions": [
+                "Check database server availability",
+                "Verify connection string",
+                "Monitor database resources"
+            ]
+        }
+    ],
+    "primary_hypothesis": {
+        "id": "hypothesis_001",
+        "description": "Database connectivity issue detected",
+        "confidence": 0.85,
+        "evidence": ["Database connection errors in logs", "Port connectivity failed"],
+        "recommended_actions": [
+            "Check database server availability",
+            "Verify connection string",
+            "Monitor database resources"
+        ]
+    },
+    "confidence_level": "high",
+    "correlations": {},
+    "recommendations": [
+        "Check database server availability",
+        "Verify connection string",
+        "Monitor database resources"
+    ],
+    "analysis_summary": "Primary hypothesis: Database connectivity issue detected (confidence: high)"
+}
+
+_MOCK_INCIDENT = {
+    "id": "INC_TEST_001",
+    "endpoint_name": "Test Service",
+    "alert_level": "high",
+    "health_check_result": {
+        "url": "https://example.com/health",
+        "status_code": 503,
+        "error_message": "Service Unavailable",
+        "response_time": 5000.0
+    },
+    "analysis_result": {
+        "primary_hypothesis": {
+            "description": "Database connectivity issue detected",
+            "confidence": 0.85,
+            "recommended_actions": [
+                "Check database server availability",
+                "Verify connection string"
+            ]
+        },
+        "confidence_level": "high"
+    },
+    "triage_data": {
+        "data_collection": {
+            "logs": {"error_count": 5},
+            "network_diagnostics": {
+                "tests": {
+                    "port_connectivity": {"status": "failed"}
+                }
+            }
+        }
+    }
+}
 
 class WorkflowTester:
     """Test the complete DevOps Sentinel workflow"""
 
+    # Suite schedule: (test name, method); coroutine methods run as tasks, the rest inline
+    TESTS = (
+        ("Configuration Loading", "_test_configuration_loading"),
+        ("Health Check Simulation", "_test_health_check_simulation"),
+        ("Message Passing", "_test_message_passing"),
+        ("Triage Data Collection", "_test_triage_data_collection"),
+        ("Analysis Agent", "_test_analysis_agent"),
+        ("Notification Formatting", "_test_notification_formatting"),
+        ("End-to-End Workflow", "_test_end_to_end_workflow")
+    )
+    TEST_ORDER = tuple(test_name for test_name, _ in TESTS)
+
     def __init__(self):
         self.project_root = Path(__file__).parent.parent
         self.logger = Logger.setup_logger("WorkflowTester")
         self.message_queue = MessageQueue()
         self.test_results = []
+        self._fail_count = 0  # kept current by _record_test_result
+        self._http_semaphore = asyncio.Semaphore(LIVE_CONCURRENCY)
+
+    @property
+    def config_manager(self) -> ConfigManager:
+        """ConfigManager shared by every test in the run, loaded on first use"""
+        return get_config_manager()
 
     async def run_all_tests(self) -> bool:
         """Run all workflow tests"""
         print("🧪 Starting DevOps Sentinel Workflow Tests")
         print("=" * 60)
 
-        try:
-            # Test 1: Configuration Loading
-            await self._test_configuration_loading()
-
-            # Test 2: Health Check Simulation
-            await self._test_health_check_simulation()
+        # One clock reading for the whole run; the tests only need a plausible timestamp
+        self._now = TimestampUtils.now_utc()
+        self._now_str = TimestampUtils.format_timestamp(self._now)
 
-            # Test 3: Message Passing
-            await self._test_message_passing()
-
-            # Test 4: Triage Data Collection
-            await self._test_triage_data_collection()
-
-            # Test 5: Analysis Agent
-            await self._test_analysis_agent()
+        # Each test records its own failures, so none of them raise here.
+        # The tests are independent: async ones are scheduled as soon as they
+        # come up so the health check overlaps with the pure-CPU tests
+        try:
+            pending = []
+            for _, method_name in self.TESTS:
+                outcome = getattr(self, method_name)()
+                if asyncio.iscoroutine(outcome):
+                    pending.append(asyncio.ensure_future(outcome))
 
-            # Test 6: Notification Formatting
-            await self._test_notification_formatting()
+            await asyncio.gather(*pending, return_exceptions=True)
 
-            # Test 7: End-to-End Workflow
-            await self._test_end_to_end_workflow()
+            # Report in suite order regardless of completion order
+            self.test_results.sort(key=lambda result: self.TEST_ORDER.index(result["test_name"]))
 
             # Generate test report
             self._generate_test_report()
 
-            return all(result['passed'] for result in self.test_results)
+            return self._fail_count == 0
 
-        except Exception as e:
-            self.logger.error(f"Test suite failed: {e}")
-            return False
+        finally:
+            # Release the checkers' pooled connections if the health check ran
+            health_check = sys.modules.get("agents.monitoring.health_check")
+            if health_check is not None:
+                await health_check.HealthChecker.close_shared_session()
 
-    async def _test_configuration_loading(self):
+    def _test_configuration_loading(self):
         """Test configuration loading"""
         test_name = "Configuration Loading"
-        print(f"\n📋 Testing: {test_name}")
+        out = [f"\n📋 Testing: {test_name}"]
 
         try:
             # Test config manager initialization
-            config_manager = ConfigManager()
+            config_manager = self.config_manager
 
             # Check endpoints loading
             endpoints = config_manager.get_endpoints()
             assert len(endpoints) > 0, "No endpoints loaded"
-            print(f"   ✅ Loaded {len(endpoints)} endpoints")
+            out.append(f"   ✅ Loaded {len(endpoints)} endpoints")
 
             # Check agent configuration loading
-            monitoring_config = config_manager.get_agent_config("monitoring")
-            assert "poll_interval" in monitoring_config, "Monitoring config missing poll_interval"
-            print(f"   ✅ Monitoring config loaded")
-
-            triage_config = config_manager.get_agent_config("triage")
-            assert "log_window_minutes" in triage_config, "Triage config missing log_window_minutes"
-            print(f"   ✅ Triage config loaded")
-
-            analysis_config = config_manager.get_agent_config("analysis")
-            assert "llm_model" in analysis_config, "Analysis config missing llm_model"
-            print(f"   ✅ Analysis config loaded")
-
-            notification_config = config_manager.get_agent_config("notification")
-            assert "cooldown_period" in notification_config, "Notification config missing cooldown_period"
-            print(f"   ✅ Notification config loaded")
+            for agent_name, required_keys in _REQUIRED_AGENT_CONFIG.items():
+                missing = required_keys - config_manager.get_agent_config(agent_name).keys()
+                assert not missing, f"{agent_name.title()} config missing {', '.join(sorted(missing))}"
+                out.append(f"   ✅ {agent_name.title()} config loaded")
 
             self._record_test_result(test_name, True, "All configurations loaded successfully")
 
         except Exception as e:
-            print(f"   ❌ Failed: {e}")
+            out.append(f"   ❌ Failed: {e}")
             self._record_test_result(test_name, False, str(e))
 
+        finally:
+            sys.stdout.write("\n".join(out) + "\n")
+
     async def _test_health_check_simulation(self):
         """Test health check simulation"""
         test_name = "Health Check Simulation"
-        print(f"\n🏥 Testing: {test_name}")
+        out = [f"\n🏥 Testing: {test_name}"]
 
         try:
             # Create a mock endpoint configuration
@@ -122,12 +297,20 @@ class WorkflowTester:
             }
 
             # Import and test health checker
-            from agents.monitoring.health_check import HealthChecker
-
-            health_checker = HealthChecker(endpoint_config)
-
-            # Simulate health check
-            result = await health_checker.check_health()
+            HealthChecker = _health_checker_cls()
+
+            if LIVE_NETWORK:
+                # Bound outbound requests so a longer endpoint list can't stampede
+                async with self._http_semaphore:
+                    health_checker = HealthChecker(endpoint_config)
+                    result = await health_checker.check_health()
+            else:
+                # Simulate health check without leaving the process
+                health_checker = HealthChecker(endpoint_config)
+                with mock.patch.object(HealthChecker, "_make_http_request",
+                                       mock.AsyncMock(return_value=_MOCK_HTTP_RESPONSE)), \
+                     mock.patch.object(HealthChecker, "_check_ssl_expiry", return_value=90):
+                    result = await health_checker.check_health()
 
             # Validate result structure
             assert isinstance(result, HealthCheckResult), "Result is not HealthCheckResult"
@@ -136,20 +319,23 @@ class WorkflowTester:
             assert isinstance(result.success, bool), "Success flag missing"
             assert isinstance(result.response_time, (int, float)), "Response time missing"
 
-            print(f"   ✅ Health check completed: {'Success' if result.success else 'Failed'}")
-            print(f"   ✅ Response time: {result.response_time:.0f}ms")
-            print(f"   ✅ Status code: {result.status_code}")
+            out.append(f"   ✅ Health check completed: {'Success' if result.success else 'Failed'}")
+            out.append(f"   ✅ Response time: {result.response_time:.0f}ms")
+            out.append(f"   ✅ Status code: {result.status_code}")
 
             self._record_test_result(test_name, True, f"Health check simulated successfully (status: {result.status_code})")
 
         except Exception as e:
-            print(f"   ❌ Failed: {e}")
+            out.append(f"   ❌ Failed: {e}")
             self._record_test_result(test_name, False, str(e))
 
-    async def _test_message_passing(self):
+        finally:
+            sys.stdout.write("\n".join(out) + "\n")
+
+    def _test_message_passing(self):
         """Test inter-agent message passing"""
         test_name = "Message Passing"
-        print(f"\n📨 Testing: {test_name}")
+        out = [f"\n📨 Testing: {test_name}"]
 
         try:
             # Test message creation
@@ -158,7 +344,7 @@ class WorkflowTester:
                 type=MessageType.TRIAGE_REQUEST,
                 sender="monitoring",
                 recipient="triage",
-                timestamp=TimestampUtils.now_utc(),
+                timestamp=self._now,
                 data={
                     "incident_id": "INC_TEST_001",
                     "endpoint_name": "Test Service",
@@ -176,297 +362,209 @@ class WorkflowTester:
             received_messages = self.message_queue.receive_messages("triage")
             assert len(received_messages) == 1, "Message not received"
             assert received_messages[0].id == message.id, "Received message ID mismatch"
-
-            print(f"   ✅ Message sent successfully")
-            print(f"   ✅ Message received successfully")
-            print(f"   ✅ Message type: {message.type.value}")
+            assert decode_payload(encode_payload(received_messages[0].data)) == message.data, "Payload round-trip mismatch"
+
+            # Test batched delivery: one drain per batch instead of per message
+            queue_logger = self.message_queue.logger
+            previous_level = queue_logger.level
+            queue_logger.setLevel(logging.WARNING)  # skip 100 "Message sent" lines
+            try:
+                for i in range(100):
+                    self.message_queue.send_message(Message(
+                        id=f"test_batch_{i:03d}",
+                        type=MessageType.ANALYSIS_REQUEST,
+                        sender="triage",
+                        recipient="analysis",
+                        timestamp=self._now,
+                        data={"sequence": i}
+                    ))
+            finally:
+                queue_logger.setLevel(previous_level)
+
+            first_batch = self.message_queue.receive_messages("analysis", max_batch=64)
+            second_batch = self.message_queue.receive_messages("analysis", max_batch=64)
+            assert len(first_batch) == 64, "First batch not capped at max_batch"
+            assert len(second_batch) == 36, "Second batch did not drain the remainder"
+            assert [m.data["sequence"] for m in first_batch + second_batch] == list(range(100)), \
+                "Batched messages out of order"
+            assert self.message_queue.receive_messages("analysis") == [], "Queue not empty after drain"
+
+            out.append(f"   ✅ Message sent successfully")
+            out.append(f"   ✅ Message received successfully")
+            out.append(f"   ✅ Message type: {message.type.value}")
+            out.append("   ✅ Batched 100 messages in 2 drains")
 
             self._record_test_result(test_name, True, "Message passing works correctly")
 
         except Exception as e:
-            print(f"   ❌ Failed: {e}")
+            out.append(f"   ❌ Failed: {e}")
             self._record_test_result(test_name, False, str(e))
 
-    async def _test_triage_data_collection(self):
+        finally:
+            sys.stdout.write("\n".join(out) + "\n")
+
+    def _test_triage_data_collection(self):
         """Test triage data collection (mocked)"""
         test_name = "Triage Data Collection"
-        print(f"\n🔍 Testing: {test_name}")
+        out = [f"\n🔍 Testing: {test_name}"]
 
         try:
             # Mock triage agent functionality
-            mock_triage_data = {
-                "incident_id": "INC_TEST_001",
-                "endpoint_name": "Test Service",
-                "collection_start_time": TimestampUtils.format_timestamp(TimestampUtils.now_utc()),
-                "data_collection": {
-                    "logs": {
-                        "service_name": "Test Service",
-                        "logs": [
-                            {"timestamp": "2024-01-15T14:30:00Z", "level": "ERROR", "message": "Database connection failed"},
-                            {"timestamp": "2024-01-15T14:31:00Z", "level": "WARN", "message": "Retry attempt 1"}
-                        ],
-                        "error_count": 1,
-                        "warning_count": 1
-                    },
-                    "network_diagnostics": {
-                        "tests": {
-                            "ping": {"status": "success", "average_time_ms": 15.2},
-                            "dns_resolution": {"status": "success", "resolution_time_ms": 5.1},
-                            "port_connectivity": {"status": "failed", "error": "Connection refused"}
-                        }
-                    },
-                    "system_metrics": {
-                        "system_metrics": {
-                            "cpu_usage_percent": 45.2,
-                            "memory_usage_percent": 67.8,
-                            "disk_usage_percent": 23.1
-                        }
-                    }
-                },
-                "summary": {
-                    "data_sources_successful": ["logs", "network_diagnostics", "system_metrics"],
-                    "key_findings": ["Found 1 errors in recent logs", "Network port connectivity failed"],
-                    "recommendations": ["Check service availability", "Verify network configuration"]
-                }
-            }
+            mock_triage_data = _MOCK_TRIAGE_DATA | {"collection_start_time": self._now_str}
 
             # Validate triage data structure
-            assert "incident_id" in mock_triage_data, "Missing incident_id"
-            assert "data_collection" in mock_triage_data, "Missing data_collection"
-            assert "summary" in mock_triage_data, "Missing summary"
+            missing = _REQUIRED_TRIAGE_KEYS - mock_triage_data.keys()
+            assert not missing, f"Missing {', '.join(sorted(missing))}"
 
             # Check data sources
             data_collection = mock_triage_data["data_collection"]
-            assert "logs" in data_collection, "Missing logs data"
-            assert "network_diagnostics" in data_collection, "Missing network diagnostics"
-            assert "system_metrics" in data_collection, "Missing system metrics"
+            missing = _REQUIRED_DATA_SOURCES - data_collection.keys()
+            assert not missing, f"Missing data sources: {', '.join(sorted(missing))}"
 
             # Check summary
             summary = mock_triage_data["summary"]
-            assert "key_findings" in summary, "Missing key findings"
-            assert "recommendations" in summary, "Missing recommendations"
+            missing = _REQUIRED_SUMMARY_KEYS - summary.keys()
+            assert not missing, f"Summary missing {', '.join(sorted(missing))}"
 
-            print(f"   ✅ Triage data structure valid")
-            print(f"   ✅ Data sources collected: {len(data_collection)}")
-            print(f"   ✅ Key findings identified: {len(summary['key_findings'])}")
-            print(f"   ✅ Recommendations generated: {len(summary['recommendations'])}")
+            out.append(f"   ✅ Triage data structure valid")
+            out.append(f"   ✅ Data sources collected: {len(data_collection)}")
+            out.append(f"   ✅ Key findings identified: {len(summary['key_findings'])}")
+            out.append(f"   ✅ Recommendations generated: {len(summary['recommendations'])}")
 
             self._record_test_result(test_name, True, "Triage data collection simulation successful")
 
         except Exception as e:
-            print(f"   ❌ Failed: {e}")
+            out.append(f"   ❌ Failed: {e}")
             self._record_test_result(test_name, False, str(e))
 
-    async def _test_analysis_agent(self):
+        finally:
+            sys.stdout.write("\n".join(out) + "\n")
+
+    def _test_analysis_agent(self):
         """Test analysis agent (mocked)"""
         test_name = "Analysis Agent"
-        print(f"\n🧠 Testing: {test_name}")
+        out = [f"\n🧠 Testing: {test_name}"]
 
         try:
             # Mock health check and triage data
-            mock_health_check = {
-                "endpoint_name": "Test Service",
-                "url": "https://example.com/health",
-                "status_code": 503,
-                "response_time": 5000.0,
-                "success": False,
-                "error_message": "Service Unavailable",
-                "timestamp": TimestampUtils.format_timestamp(TimestampUtils.now_utc())
-            }
+            mock_health_check = _MOCK_HEALTH_CHECK | {"timestamp": self._now_str}
 
-            mock_triage_data = {
-                "data_collection": {
-                    "logs": {
-                        "error_count": 5,
-                        "error_patterns": [{"pattern": "database connection", "count": 3}]
-                    },
-                    "network_diagnostics": {
-                        "tests": {
-                            "port_connectivity": {"status": "failed"}
-                        }
-                    }
-                }
-            }
+            mock_triage_data = _MOCK_ANALYSIS_TRIAGE_DATA
 
             # Mock analysis result
-            mock_analysis_result = {
-                "incident_id": "INC_TEST_001",
-                "analysis_start_time": TimestampUtils.format_timestamp(TimestampUtils.now_utc()),
-                "hypotheses": [
-                    {
-                        "id": "hypothesis_001",
-                        "description": "Database connectivity issue detected",
-                        "confidence": 0.85,
-                        "evidence": ["Database connection errors in logs", "Port connectivity failed"],
-                        "recommended_actions": [
-                            "Check database server availability",
-                            "Verify connection string",
-                            "Monitor database resources"
-                        ]
-                    }
-                ],
-                "primary_hypothesis": {
-                    "id": "hypothesis_001",
-                    "description": "Database connectivity issue detected",
-                    "confidence": 0.85,
-                    "evidence": ["Database connection errors in logs", "Port connectivity failed"],
-                    "recommended_actions": [
-                        "Check database server availability",
-                        "Verify connection string",
-                        "Monitor database resources"
-                    ]
-                },
-                "confidence_level": "high",
-                "correlations": {},
-                "recommendations": [
-                    "Check database server availability",
-                    "Verify connection string",
-                    "Monitor database resources"
-                ],
-                "analysis_summary": "Primary hypothesis: Database connectivity issue detected (confidence: high)"
-            }
+            mock_analysis_result = _MOCK_ANALYSIS_RESULT | {"analysis_start_time": self._now_str}
 
             # Validate analysis result
-            assert "hypotheses" in mock_analysis_result, "Missing hypotheses"
-            assert "primary_hypothesis" in mock_analysis_result, "Missing primary hypothesis"
-            assert "confidence_level" in mock_analysis_result, "Missing confidence level"
-            assert "recommendations" in mock_analysis_result, "Missing recommendations"
+            missing = _REQUIRED_ANALYSIS_KEYS - mock_analysis_result.keys()
+            assert not missing, f"Missing {', '.join(sorted(missing))}"
 
             # Check primary hypothesis
             primary = mock_analysis_result["primary_hypothesis"]
             assert primary["confidence"] > 0.7, "Low confidence hypothesis"
             assert len(primary["recommended_actions"]) > 0, "No recommended actions"
 
-            print(f"   ✅ Analysis completed successfully")
-            print(f"   ✅ Generated {len(mock_analysis_result['hypotheses'])} hypotheses")
-            print(f"   ✅ Primary hypothesis confidence: {primary['confidence']}")
-            print(f"   ✅ Confidence level: {mock_analysis_result['confidence_level']}")
-            print(f"   ✅ Recommendations: {len(primary['recommended_actions'])}")
+            out.append(f"   ✅ Analysis completed successfully")
+            out.append(f"   ✅ Generated {len(mock_analysis_result['hypotheses'])} hypotheses")
+            out.append(f"   ✅ Primary hypothesis confidence: {primary['confidence']}")
+            out.append(f"   ✅ Confidence level: {mock_analysis_result['confidence_level']}")
+            out.append(f"   ✅ Recommendations: {len(primary['recommended_actions'])}")
 
             self._record_test_result(test_name, True, "Analysis agent simulation successful")
 
         except Exception as e:
-            print(f"   ❌ Failed: {e}")
+            out.append(f"   ❌ Failed: {e}")
             self._record_test_result(test_name, False, str(e))
 
-    async def _test_notification_formatting(self):
+        finally:
+            sys.stdout.write("\n".join(out) + "\n")
+
+    def _test_notification_formatting(self):
         """Test notification formatting"""
         test_name = "Notification Formatting"
-        print(f"\n📢 Testing: {test_name}")
+        out = [f"\n📢 Testing: {test_name}"]
 
         try:
             # Mock incident data
-            mock_incident = {
-                "id": "INC_TEST_001",
-                "endpoint_name": "Test Service",
-                "alert_level": "high",
-                "timestamp": TimestampUtils.format_timestamp(TimestampUtils.now_utc()),
-                "health_check_result": {
-                    "url": "https://example.com/health",
-                    "status_code": 503,
-                    "error_message": "Service Unavailable",
-                    "response_time": 5000.0
-                },
-                "analysis_result": {
-                    "primary_hypothesis": {
-                        "description": "Database connectivity issue detected",
-                        "confidence": 0.85,
-                        "recommended_actions": [
-                            "Check database server availability",
-                            "Verify connection string"
-                        ]
-                    },
-                    "confidence_level": "high"
-                },
-                "triage_data": {
-                    "data_collection": {
-                        "logs": {"error_count": 5},
-                        "network_diagnostics": {
-                            "tests": {
-                                "port_connectivity": {"status": "failed"}
-                            }
-                        }
-                    }
-                }
-            }
+            mock_incident = _MOCK_INCIDENT | {"timestamp": self._now_str}
 
             # Test Slack formatting
-            from agents.notification.alert_formatter import AlertFormatter
-            formatter = AlertFormatter()
+            formatter = _alert_formatter_cls().get()
 
             slack_alert = formatter.format_slack_alert(mock_incident)
             assert "attachments" in slack_alert, "Missing attachments in Slack alert"
             assert len(slack_alert["attachments"]) > 0, "No attachments found"
 
             attachment = slack_alert["attachments"][0]
-            assert "title" in attachment, "Missing title in attachment"
-            assert "fields" in attachment, "Missing fields in attachment"
+            missing = _REQUIRED_SLACK_ATTACHMENT_KEYS - attachment.keys()
+            assert not missing, f"Missing {', '.join(sorted(missing))} in attachment"
             assert "Test Service" in attachment["title"], "Service name not in title"
 
-            print(f"   ✅ Slack alert formatted successfully")
-            print(f"   ✅ Title: {attachment['title']}")
+            out.append(f"   ✅ Slack alert formatted successfully")
+            out.append(f"   ✅ Title: {attachment['title']}")
 
             # Test email formatting
             email_alert = formatter.format_email_alert(mock_incident)
-            assert "subject" in email_alert, "Missing subject in email"
-            assert "html_body" in email_alert, "Missing HTML body"
-            assert "text_body" in email_alert, "Missing text body"
+            missing = _REQUIRED_EMAIL_KEYS - email_alert.keys()
+            assert not missing, f"Missing {', '.join(sorted(missing))} in email"
             assert "INC_TEST_001" in email_alert["subject"], "Incident ID not in subject"
 
-            print(f"   ✅ Email alert formatted successfully")
-            print(f"   ✅ Subject: {email_alert['subject']}")
+            out.append(f"   ✅ Email alert formatted successfully")
+            out.append(f"   ✅ Subject: {email_alert['subject']}")
 
             # Test PagerDuty formatting
             pagerduty_alert = formatter.format_pagerduty_alert(mock_incident)
             assert "payload" in pagerduty_alert, "Missing payload in PagerDuty alert"
             assert "summary" in pagerduty_alert["payload"], "Missing summary"
 
-            print(f"   ✅ PagerDuty alert formatted successfully")
-            print(f"   ✅ Summary: {pagerduty_alert['payload']['summary']}")
+            out.append(f"   ✅ PagerDuty alert formatted successfully")
+            out.append(f"   ✅ Summary: {pagerduty_alert['payload']['summary']}")
 
             self._record_test_result(test_name, True, "All notification formats generated successfully")
 
         except Exception as e:
-            print(f"   ❌ Failed: {e}")
+            out.append(f"   ❌ Failed: {e}")
             self._record_test_result(test_name, False, str(e))
 
+        finally:
+            sys.stdout.write("\n".join(out) + "\n")
+
     async def _test_end_to_end_workflow(self):
         """Test complete end-to-end workflow"""
         test_name = "End-to-End Workflow"
-        print(f"\n🔄 Testing: {test_name}")
+        out = [f"\n🔄 Testing: {test_name}"]
 
         try:
             # Simulate complete workflow
             workflow_steps = []
 
             # Step 1: Health check failure detection
-            print("   📍 Step 1: Simulating health check failure...")
+            out.append("   📍 Step 1: Simulating health check failure...")
             health_check_result = HealthCheckResult(
                 endpoint_name="Test Service",
                 url="https://example.com/health",
                 status_code=503,
                 response_time=5000.0,
-                timestamp=TimestampUtils.now_utc(),
+                timestamp=self._now,
                 success=False,
                 error_message="Service Unavailable"
             )
             workflow_steps.append("✅ Health check failure detected")
 
             # Step 2: Incident creation
-            print("   📍 Step 2: Creating incident...")
+            out.append("   📍 Step 2: Creating incident...")
             incident = Incident(
-                id=IncidentIDGenerator.generate(),
+                id=IncidentIDGenerator.generate(self._now),
                 endpoint_name="Test Service",
                 status=IncidentStatus.DETECTED,
                 alert_level=AlertLevel.HIGH,
-                timestamp=TimestampUtils.now_utc(),
-                last_updated=TimestampUtils.now_utc(),
+                timestamp=self._now,
+                last_updated=self._now,
                 health_check_result=health_check_result
             )
             workflow_steps.append("✅ Incident created")
 
             # Step 3: Triage request
-            print("   📍 Step 3: Triggering triage workflow...")
+            out.append("   📍 Step 3: Triggering triage workflow...")
             # Mock triage completion
             triage_data = {
                 "incident_id": incident.id,
@@ -479,7 +577,7 @@ class WorkflowTester:
             workflow_steps.append("✅ Triage data collected")
 
             # Step 4: Analysis request
-            print("   📍 Step 4: Performing root cause analysis...")
+            out.append("   📍 Step 4: Performing root cause analysis...")
             # Mock analysis completion
             analysis_result = {
                 "incident_id": incident.id,
@@ -493,7 +591,7 @@ class WorkflowTester:
             workflow_steps.append("✅ Root cause analysis completed")
 
             # Step 5: Notification
-            print("   📍 Step 5: Sending notifications...")
+            out.append("   📍 Step 5: Sending notifications...")
             # Mock notification delivery
             notification_results = [
                 {"channel": "slack", "success": True},
@@ -507,26 +605,31 @@ class WorkflowTester:
             assert all("✅" in step for step in workflow_steps), "Failed workflow steps"
 
             for step in workflow_steps:
-                print(f"      {step}")
+                out.append(f"      {step}")
 
-            print(f"   🎉 End-to-end workflow completed successfully!")
-            print(f"   📊 Incident ID: {incident.id}")
-            print(f"   🎯 Root cause: {analysis_result['primary_hypothesis']['description']}")
-            print(f"   📊 Confidence: {analysis_result['confidence_level']}")
+            out.append(f"   🎉 End-to-end workflow completed successfully!")
+            out.append(f"   📊 Incident ID: {incident.id}")
+            out.append(f"   🎯 Root cause: {analysis_result['primary_hypothesis']['description']}")
+            out.append(f"   📊 Confidence: {analysis_result['confidence_level']}")
 
             self._record_test_result(test_name, True, f"Complete workflow tested with incident {incident.id}")
 
         except Exception as e:
-            print(f"   ❌ Failed: {e}")
+            out.append(f"   ❌ Failed: {e}")
             self._record_test_result(test_name, False, str(e))
 
+        finally:
+            sys.stdout.write("\n".join(out) + "\n")
+
     def _record_test_result(self, test_name: str, passed: bool, message: str):
         """Record test result"""
+        if not passed:
+            self._fail_count += 1
         self.test_results.append({
             "test_name": test_name,
             "passed": passed,
             "message": message,
-            "timestamp": TimestampUtils.format_timestamp(TimestampUtils.now_utc())
+            "timestamp": self._now_str
         })
 
     def _generate_test_report(self):
@@ -535,35 +638,40 @@ class WorkflowTester:
         print("📊 TEST REPORT")
         print("=" * 60)
 
+        passed, failed = [], []
+        for result in self.test_results:
+            (passed if result["passed"] else failed).append(result)
+
         total_tests = len(self.test_results)
-        passed_tests = sum(1 for result in self.test_results if result["passed"])
-        failed_tests = total_tests - passed_tests
+        passed_tests = total_tests - self._fail_count
 
         print(f"Total Tests: {total_tests}")
         print(f"Passed: {passed_tests} ✅")
-        print(f"Failed: {failed_tests} ❌")
+        print(f"Failed: {self._fail_count} ❌")
         print(f"Success Rate: {(passed_tests/total_tests)*100:.1f}%")
 
-        if failed_tests > 0:
+        if self._fail_count:
             print("\n❌ Failed Tests:")
-            for result in self.test_results:
-                if not result["passed"]:
-                    print(f"   • {result['test_name']}: {result['message']}")
+            for result in failed:
+                print(f"   • {result['test_name']}: {result['message']}")
 
         print("\n✅ Passed Tests:")
-        for result in self.test_results:
-            if result["passed"]:
-                print(f"   • {result['test_name']}")
+        for result in passed:
+            print(f"   • {result['test_name']}")
 
         print("\n" + "=" * 60)
 
-        if failed_tests == 0:
+        if self._fail_count == 0:
             print("🎉 All tests passed! DevOps Sentinel is ready for deployment.")
         else:
             print("⚠️  Some tests failed. Please review and fix issues before deployment.")
 
 async def main():
     """Main test function"""
+    # Tests that never suspend run inline instead of being scheduled (Python 3.12+)
+    if hasattr(asyncio, "eager_task_factory"):
+        asyncio.get_running_loop().set_task_factory(asyncio.eager_task_factory)
+
     tester = WorkflowTester()
     success = await tester.run_all_tests()
 
@@ -575,4 +683,11 @@ async def main():
         sys.exit(1)
 
 if __name__ == "__main__":
+    # Use the libuv-backed event loop when it is installed
+    try:
+        import uvloop
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    except ImportError:
+        pass
+
     asyncio.run(main())
\ No newline at end of file